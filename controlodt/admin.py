@@ -35,7 +35,7 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
 
-from .models import Maquinaria, TipoMaquinaria, RegistroODT, DetalleEjecucion, Repuesto, PersonalNecesario
+from .models import Maquinaria, TipoMaquinaria, RegistroODT, DetalleEjecucion, Repuesto, PersonalNecesario, Secuencia, TrabajoReporte
 
 admin.site.register(Maquinaria)
 admin.site.register(TipoMaquinaria)
@@ -43,6 +43,8 @@ admin.site.register(RegistroODT)
 admin.site.register(DetalleEjecucion)
 admin.site.register(Repuesto)
 admin.site.register(PersonalNecesario)
+admin.site.register(Secuencia)
+admin.site.register(TrabajoReporte)
 
 
 # Register your models here.
@@ -0,0 +1,130 @@
+"""
+Búsqueda de usuarios sobre la columna User.busqueda (nombre, apellidos,
+correo y CI en minúsculas y sin tildes), mantenida en User.save().
+
+- PostgreSQL: índice GIN con pg_trgm, que sirve a LIKE '%texto%'.
+- SQLite: tabla FTS5 con tokenizador trigram (controlodt_user_busqueda),
+  sincronizada por triggers; los términos de menos de 3 letras no tienen
+  trigramas y se filtran con LIKE sobre la columna.
+- Otros motores: LIKE sobre la columna ya normalizada.
+Creado en la migración 0013_busqueda_usuario; `manage.py reindexar_busqueda_usuarios`
+recalcula la columna y rehace los índices (p. ej. si una migración
+posterior reconstruye la tabla de usuarios en SQLite y se pierden los triggers).
+"""
+import unicodedata
+
+from django.db import OperationalError, connections
+from django.db.models.expressions import RawSQL
+
+TABLA_FTS = 'controlodt_user_busqueda'
+INDICE_TRIGRAMA = 'user_busqueda_trgm_idx'
+TRIGGERS_FTS = {
+    'ai': 'AFTER INSERT ON {tabla} BEGIN '
+          'INSERT INTO {fts}(rowid, busqueda) VALUES (new.id, new.busqueda); END',
+    'au': 'AFTER UPDATE OF busqueda ON {tabla} BEGIN '
+          'DELETE FROM {fts} WHERE rowid = old.id; '
+          'INSERT INTO {fts}(rowid, busqueda) VALUES (new.id, new.busqueda); END',
+    'ad': 'AFTER DELETE ON {tabla} BEGIN DELETE FROM {fts} WHERE rowid = old.id; END',
+}
+CAMPOS = ('nombre', 'apellido', 'apellidoM', 'email', 'dni')
+MINIMO_TRIGRAMA = 3
+
+# alias de BD -> ¿están la tabla FTS5 y sus triggers? (se consulta una vez por proceso)
+_fts = {}
+
+
+def normalizar(texto):
+    """Minúsculas, sin tildes ni diéresis y con espacios simples."""
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    sin_marcas = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return ' '.join(sin_marcas.lower().split())
+
+
+def texto_busqueda(usuario):
+    return normalizar(' '.join(getattr(usuario, campo) or '' for campo in CAMPOS))
+
+
+# =========================
+#         ÍNDICES
+# =========================
+def crear_indices(conexion, tabla):
+    """
+    Índice trigram (PostgreSQL) o tabla FTS5 + triggers (SQLite) sobre
+    `tabla`.busqueda. Si el SQLite no trae FTS5/trigram (< 3.34) no hace
+    nada y la búsqueda sigue con LIKE.
+    """
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {INDICE_TRIGRAMA} ON {tabla} USING gin (busqueda gin_trgm_ops)')
+        elif conexion.vendor == 'sqlite':
+            try:
+                cursor.execute(f"CREATE VIRTUAL TABLE {TABLA_FTS} USING fts5(busqueda, tokenize='trigram')")
+            except OperationalError:
+                return
+            for sufijo, cuerpo in TRIGGERS_FTS.items():
+                cursor.execute(f'CREATE TRIGGER {TABLA_FTS}_{sufijo} ' + cuerpo.format(tabla=tabla, fts=TABLA_FTS))
+            cursor.execute(f'INSERT INTO {TABLA_FTS}(rowid, busqueda) SELECT id, busqueda FROM {tabla}')
+    _fts.pop(conexion.alias, None)
+
+
+def borrar_indices(conexion):
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {INDICE_TRIGRAMA}')
+        elif conexion.vendor == 'sqlite':
+            for sufijo in TRIGGERS_FTS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {TABLA_FTS}_{sufijo}')
+            cursor.execute(f'DROP TABLE IF EXISTS {TABLA_FTS}')
+    _fts.pop(conexion.alias, None)
+
+
+def _usa_fts(alias):
+    """La tabla FTS5 solo se usa si existen ella y sus tres triggers."""
+    if alias not in _fts:
+        conexion = connections[alias]
+        disponible = False
+        if conexion.vendor == 'sqlite':
+            with conexion.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND name LIKE %s)",
+                    (TABLA_FTS, f'{TABLA_FTS}_%'),
+                )
+                nombres = {fila[0] for fila in cursor.fetchall()}
+            disponible = nombres >= {TABLA_FTS, *(f'{TABLA_FTS}_{s}' for s in TRIGGERS_FTS)}
+        _fts[alias] = disponible
+    return _fts[alias]
+
+
+# =========================
+#         BÚSQUEDA
+# =========================
+def _frase_fts(termino):
+    return '"%s"' % termino.replace('"', '""')
+
+
+def buscar_usuarios(queryset, texto):
+    """Filtra `queryset` (de User) por todos los términos de `texto`."""
+    terminos = normalizar(texto).split()
+    if not terminos:
+        return queryset
+    if _usa_fts(queryset.db):
+        largos = [t for t in terminos if len(t) >= MINIMO_TRIGRAMA]
+        if largos:
+            queryset = queryset.filter(pk__in=RawSQL(
+                f'SELECT rowid FROM {TABLA_FTS} WHERE {TABLA_FTS} MATCH %s',
+                (' '.join(_frase_fts(t) for t in largos),),
+            ))
+        terminos = [t for t in terminos if len(t) < MINIMO_TRIGRAMA]
+    for termino in terminos:
+        queryset = queryset.filter(busqueda__contains=termino)
+    return queryset
+
+
+def ids_usuarios(texto, using=None):
+    """
+    Subconsulta con los ids de los usuarios que coinciden con `texto`, para
+    filtrar por FK (`campo_id__in`) sin traer a Python una lista sin límite.
+    """
+    from .models import User
+    return buscar_usuarios(User._base_manager.using(using), texto).order_by().values('pk')
@@ -0,0 +1,133 @@
+"""
+Caché en disco de PDFs de detalle, direccionada por contenido.
+
+- huella_detalle() resume en un hash todo lo que cambia el PDF: la ODT
+  (actualizado_en), el nombre de su tipo y de su maquinaria, su detalle,
+  repuestos y personal, y los usuarios que aparecen en él (updated_at +
+  archivo de firma). huellas_detalle() hace lo mismo para muchas ODT con
+  las mismas tres consultas.
+- CachePDF guarda un archivo por hash y desaloja por LRU (mtime) cuando se
+  supera el tamaño máximo.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import NamedTuple
+
+from django.conf import settings
+
+from .models import PersonalNecesario, RegistroODT, RegistroODTQuerySet, Repuesto
+
+# Subir si cambia la plantilla odt/odt_detalle_pdf.html (invalida todo)
+VERSION = 2
+
+USUARIOS_DETALLE = RegistroODTQuerySet.USUARIOS_DETALLE
+# Tipo y maquinaria se editan aparte: renombrarlos no toca actualizado_en de la ODT
+CAMPOS_CATALOGO = ('tipo__nombre', 'maquinaria__nombre', 'maquinaria__codigo')
+CAMPOS_DETALLE = (
+    'descripcion_falla', 'falla_tipo', 'hora_inicio_trabajo', 'hora_fin_trabajo', 'tareas_realizadas',
+    'medidas_seguridad', 'observaciones', 'ejecutado_por_id', 'firmado_fecha',
+)
+
+
+class Huella(NamedTuple):
+    clave: str
+    modificado: object  # datetime más reciente entre ODT y usuarios
+
+
+def _campos_huella():
+    campos = ['actualizado_en', *CAMPOS_CATALOGO, *(f'detalle_ejecucion__{c}' for c in CAMPOS_DETALLE)]
+    for usuario in USUARIOS_DETALLE:
+        campos += [f'{usuario}_id', f'{usuario}__updated_at', f'{usuario}__firma', f'{usuario}__firma_pdf']
+    return campos
+
+
+def _huella(pk, fila, repuestos, personal):
+    contenido = repr((VERSION, pk, sorted(fila.items()), repuestos, personal))
+    fechas = [fila['actualizado_en'], *(fila[f'{u}__updated_at'] for u in USUARIOS_DETALLE)]
+    return Huella(
+        clave=hashlib.sha256(contenido.encode()).hexdigest(),
+        modificado=max(f for f in fechas if f is not None),
+    )
+
+
+def huella_detalle(pk):
+    """Huella del PDF de detalle de la ODT `pk` (None si no existe). Tres consultas."""
+    fila = RegistroODT.objects.filter(pk=pk).values(*_campos_huella()).first()
+    if fila is None:
+        return None
+
+    repuestos = list(Repuesto.objects.filter(registro_id=pk).order_by('pk')
+                     .values_list('pk', 'codigo', 'descripcion', 'cantidad_utilizada'))
+    personal = list(PersonalNecesario.objects.filter(registro_id=pk).order_by('pk')
+                    .values_list('pk', 'categoria', 'trabajador', 'horas_trabajadas'))
+    return _huella(pk, fila, repuestos, personal)
+
+
+def huellas_detalle(pks):
+    """{pk: Huella} de varias ODT (las inexistentes se omiten). Tres consultas en total."""
+    filas = {fila.pop('id'): fila for fila in RegistroODT.objects.filter(pk__in=pks).values('id', *_campos_huella())}
+    repuestos = {pk: [] for pk in filas}
+    for registro_id, *valores in (Repuesto.objects.filter(registro_id__in=filas).order_by('pk')
+                                  .values_list('registro_id', 'pk', 'codigo', 'descripcion', 'cantidad_utilizada')):
+        repuestos[registro_id].append(tuple(valores))
+    personal = {pk: [] for pk in filas}
+    for registro_id, *valores in (PersonalNecesario.objects.filter(registro_id__in=filas).order_by('pk')
+                                  .values_list('registro_id', 'pk', 'categoria', 'trabajador', 'horas_trabajadas')):
+        personal[registro_id].append(tuple(valores))
+    return {pk: _huella(pk, fila, repuestos[pk], personal[pk]) for pk, fila in filas.items()}
+
+
+class CachePDF:
+    def __init__(self, directorio, max_bytes):
+        self.directorio = str(directorio)
+        self.max_bytes = max_bytes
+
+    def ruta(self, clave):
+        return os.path.join(self.directorio, f'{clave}.pdf')
+
+    def obtener(self, clave):
+        """Ruta del PDF en caché (y lo marca como usado), o None."""
+        ruta = self.ruta(clave)
+        try:
+            os.utime(ruta)
+        except FileNotFoundError:
+            return None
+        return ruta
+
+    def guardar(self, clave, archivo):
+        """Copia `archivo` (binario, desde su posición actual) a la caché."""
+        os.makedirs(self.directorio, exist_ok=True)
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as destino:
+            shutil.copyfileobj(archivo, destino)
+        os.replace(temporal, self.ruta(clave))
+        self.desalojar()
+        return self.ruta(clave)
+
+    def desalojar(self):
+        """Borra los menos usados hasta quedar bajo max_bytes."""
+        entradas = []
+        total = 0
+        with os.scandir(self.directorio) as it:
+            for entrada in it:
+                if entrada.name.endswith('.pdf'):
+                    stat = entrada.stat()
+                    entradas.append((stat.st_mtime, stat.st_size, entrada.path))
+                    total += stat.st_size
+        for _, tamano, ruta in sorted(entradas):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+            total -= tamano
+
+
+def cache_detalle():
+    return CachePDF(
+        getattr(settings, 'PDF_CACHE_DIR', settings.BASE_DIR / 'cache' / 'pdf'),
+        getattr(settings, 'PDF_CACHE_MAX_BYTES', 200 * 1024 * 1024),
+    )
@@ -0,0 +1,199 @@
+"""
+Exportaciones masivas de ODTs en streaming (memoria constante).
+
+- Las filas se leen con values() + joins y .iterator() por bloques,
+  sin instanciar modelos ni disparar consultas por fila.
+- CSV/NDJSON recorren las ODTs por bloques de pk (keyset) y traen los
+  hijos de cada bloque con una consulta por tabla.
+"""
+import csv
+from itertools import chain, islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import DetalleEjecucion, PersonalNecesario, RegistroODT, Repuesto
+
+TAMANO_BLOQUE = 2000
+
+
+def nombre_completo(fila, prefijo):
+    partes = [fila[f'{prefijo}__nombre'], fila[f'{prefijo}__apellido'], fila[f'{prefijo}__apellidoM']]
+    return ' '.join(p for p in partes if p).strip()
+
+
+def _campos_usuario(*prefijos):
+    return [f'{p}__{campo}' for p in prefijos for campo in ('nombre', 'apellido', 'apellidoM')]
+
+
+# =========================
+#          EXCEL
+# =========================
+ENCABEZADOS_EXCEL = [
+    "N° ODT",
+    "Fecha",
+    "Falla Reportada",
+    "Línea",
+    "Prioridad",
+    "Equipo / Parte",
+    "Solicitado Por",
+    "Entregado A",
+    "Estado",
+]
+CAMPOS_EXCEL = [
+    'n_odt', 'creado_en', 'titulo', 'tipo__nombre', 'prioridad', 'maquinaria__nombre', 'estado',
+    *_campos_usuario('creado_por', 'responsable_ejecucion'),
+]
+# Filas que se leen antes de escribir para estimar el ancho de columnas
+# (en modo write-only los anchos deben fijarse antes de la primera fila)
+MUESTRA_ANCHO = 1000
+
+
+def filas_excel(queryset):
+    prioridades = dict(RegistroODT.prioridad_choices)
+    estados = dict(RegistroODT.EstadoODT.choices)
+    filas = queryset.order_by('-creado_en').values(*CAMPOS_EXCEL).iterator(chunk_size=TAMANO_BLOQUE)
+    for fila in filas:
+        yield [
+            f"{fila['n_odt']:03d}" if fila['n_odt'] is not None else "",
+            timezone.localtime(fila['creado_en']).strftime("%d/%m/%Y") if fila['creado_en'] else "",
+            fila['titulo'],
+            fila['tipo__nombre'] or "",
+            str(prioridades.get(fila['prioridad'], fila['prioridad'])),
+            fila['maquinaria__nombre'] or "",
+            nombre_completo(fila, 'creado_por'),
+            nombre_completo(fila, 'responsable_ejecucion'),
+            str(estados.get(fila['estado'], fila['estado'])),
+        ]
+
+
+def escribir_excel(queryset, destino):
+    """
+    Escribe el reporte .xlsx en `destino` (ruta o archivo) con un workbook
+    write-only: las filas van a disco a medida que se agregan.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Reporte ODTs")
+
+    filas = filas_excel(queryset)
+    muestra = list(islice(filas, MUESTRA_ANCHO))
+
+    # Ancho estimado con encabezados + muestra (máximo acumulado por columna)
+    anchos = [len(h) for h in ENCABEZADOS_EXCEL]
+    for fila in muestra:
+        for i, valor in enumerate(fila):
+            anchos[i] = max(anchos[i], len(valor))
+    for i, ancho in enumerate(anchos, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = ancho + 2
+
+    encabezados = []
+    for titulo in ENCABEZADOS_EXCEL:
+        cell = WriteOnlyCell(ws, value=titulo)
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal="center")
+        encabezados.append(cell)
+    ws.append(encabezados)
+
+    for fila in chain(muestra, filas):
+        ws.append(fila)
+
+    wb.save(destino)
+
+
+# =========================
+#   CSV / NDJSON (BI)
+# =========================
+CAMPOS_ODT = [
+    'id', 'n_odt', 'correlativo', 'titulo', 'descripcion', 'estado', 'prioridad', 'tipo_trabajo',
+    'tipo_id', 'tipo__nombre', 'maquinaria_id', 'maquinaria__codigo', 'maquinaria__nombre',
+    'creado_por_id', 'revisado_por_id', 'aprobado_por_id', 'responsable_ejecucion_id', 'autorizado_por_id',
+    'fecha_programada', 'fecha_inicio', 'fecha_termino', 'archivo_informe', 'creado_en', 'actualizado_en',
+]
+
+# tabla -> (modelo, campos); todas las tablas hijas se relacionan por registro_id
+TABLAS_HIJAS = {
+    'detalle': (DetalleEjecucion, [
+        'registro_id', 'descripcion_falla', 'falla_tipo', 'hora_inicio_trabajo', 'hora_fin_trabajo',
+        'tareas_realizadas', 'medidas_seguridad', 'observaciones', 'ejecutado_por_id', 'firmado_fecha',
+    ]),
+    'repuestos': (Repuesto, ['id', 'registro_id', 'codigo', 'descripcion', 'cantidad_utilizada']),
+    'personal': (PersonalNecesario, ['id', 'registro_id', 'categoria', 'trabajador', 'horas_trabajadas']),
+}
+TABLAS_CSV = ['odt', *TABLAS_HIJAS]
+
+
+def lotes_odt(queryset, hijas=tuple(TABLAS_HIJAS), tamano=TAMANO_BLOQUE):
+    """
+    Genera listas de ODTs (dicts) de hasta `tamano` elementos, cada una con
+    sus hijas en `odt[tabla]` (detalle: dict o None; el resto: listas).
+    Cada bloque cuesta una consulta de ODTs + una por tabla hija.
+    """
+    ultimo = 0
+    queryset = queryset.order_by('pk')
+    while True:
+        lote = list(queryset.filter(pk__gt=ultimo).values(*CAMPOS_ODT)[:tamano])
+        if not lote:
+            return
+        ultimo = lote[-1]['id']
+
+        por_id = {}
+        for odt in lote:
+            por_id[odt['id']] = odt
+            for tabla in hijas:
+                odt[tabla] = None if tabla == 'detalle' else []
+
+        for tabla in hijas:
+            modelo, campos = TABLAS_HIJAS[tabla]
+            hijos = modelo.objects.filter(registro_id__in=por_id).order_by('registro_id').values(*campos)
+            for hijo in hijos:
+                odt = por_id[hijo['registro_id']]
+                if tabla == 'detalle':
+                    odt[tabla] = hijo
+                else:
+                    odt[tabla].append(hijo)
+        yield lote
+
+
+def filas_ndjson(queryset):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for lote in lotes_odt(queryset):
+        yield ''.join(encoder.encode(odt) + '\n' for odt in lote)
+
+
+class _Eco:
+    """Pseudo-archivo para csv.writer: devuelve la línea en vez de guardarla."""
+    def write(self, value):
+        return value
+
+
+def filas_csv(queryset, tabla='odt'):
+    writer = csv.writer(_Eco())
+    if tabla == 'odt':
+        campos = CAMPOS_ODT
+        yield writer.writerow(campos)
+        for lote in lotes_odt(queryset, hijas=()):
+            yield ''.join(writer.writerow([odt[c] for c in campos]) for odt in lote)
+        return
+
+    campos = TABLAS_HIJAS[tabla][1]
+    yield writer.writerow(campos)
+    for lote in lotes_odt(queryset, hijas=(tabla,)):
+        filas = []
+        for odt in lote:
+            hijos = odt[tabla]
+            for hijo in ([hijos] if tabla == 'detalle' and hijos else hijos or []):
+                filas.append(writer.writerow([hijo[c] for c in campos]))
+        if filas:
+            yield ''.join(filas)
+
+
+def respuesta_streaming(filas, content_type, nombre_archivo):
+    response = StreamingHttpResponse(filas, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
+    return response
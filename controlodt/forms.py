@@ -1,6 +1,8 @@
 from django import forms
 from django.contrib.auth import authenticate
+from django.utils.choices import BaseChoiceIterator
 from django.utils.translation import gettext_lazy as _
+from . import listas
 from .models import User
 
 from django.contrib.auth.models import Group, Permission
@@ -107,6 +109,37 @@ class TailwindFormMixin:
         widget.attrs["class"] = " ".join(existing)
 
 
+# =========================
+# Mixin de opciones cacheadas
+# =========================
+class OpcionesListado(BaseChoiceIterator):
+    """Opciones de un ModelChoiceField leídas de listas.opciones() en cada render."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        yield from listas.opciones(self.field.lista)
+
+
+class OpcionesCacheadasMixin:
+    """
+    `opciones_cacheadas = {campo: lista}`: esos ModelChoiceField pintan sus
+    opciones desde la caché (listas.py) y validan contra el queryset de la lista.
+    """
+    opciones_cacheadas = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, lista in self.opciones_cacheadas.items():
+            field = self.fields[name]
+            field.lista = lista
+            field.iterator = OpcionesListado
+            field.queryset = listas.queryset(lista)  # también reasigna widget.choices
+
+
 # ==================
 # Formulario: Login
 # ==================
@@ -312,22 +345,10 @@ class CambiarPasswordForm(TailwindFormMixin, PasswordChangeForm):
 
 
 from django.contrib.auth.models import Group, Permission
-from django.db.models import Q
 from django import forms
-from django.conf import settings
 from collections import OrderedDict
 from django.utils.translation import gettext_lazy as _
-
-EXCLUDED_APPS = {"admin", "contenttypes", "sessions"}
-
-ACTION_LABEL = {
-    'add': _('Agregar'),
-    'change': _('Modificar'),
-    'delete': _('Eliminar'),
-    'view': _('Ver'),
-    # agrega mapeos para permisos personalizados si los tienes
-    # 'usuarios': _('Permiso para usuarios'),
-}
+from .permisos import catalogo_permisos
 
 class GroupForm(TailwindFormMixin, forms.ModelForm):
     permissions = forms.ModelMultipleChoiceField(
@@ -345,96 +366,40 @@ class GroupForm(TailwindFormMixin, forms.ModelForm):
         widgets = {"name": forms.TextInput(attrs={"placeholder": _("Nombre del grupo")})}
 
     # ---------- helpers ----------
-    def _build_allowed_qs(self):
+    def _ensure_catalogo(self):
         """
-        Define el queryset base de permisos permitidos.
-        Si settings.GROUP_PERMISSION_APPS existe, usa esas apps; si no, usa todas excepto EXCLUDED_APPS.
-        SIEMPRE incluye permisos del modelo Group (auth.group) para gestionar grupos.
-        Siempre incluimos permisos ya asignados al grupo para evitar que se pierdan en edición.
+        Permisos permitidos (catálogo por proceso, ver permisos.py) más los
+        ya asignados al grupo, para que no se pierdan en edición. Los
+        asignados salen del initial que ModelForm ya cargó de la instancia.
         """
-        allowed_apps = getattr(settings, "GROUP_PERMISSION_APPS", None)
-        
-        # Filtro base según configuración
-        if allowed_apps:
-            base_filter = Q(content_type__app_label__in=allowed_apps)
-        else:
-            base_filter = ~Q(content_type__app_label__in=EXCLUDED_APPS)
-        
-        # IMPORTANTE: Siempre incluir permisos del modelo Group (auth.group)
-        group_perms_filter = Q(content_type__app_label='auth', content_type__model='group')
-        
-        # Combinar filtros: (base_filter OR group_perms)
-        combined_filter = base_filter | group_perms_filter
-
-        # Incluir permisos ya asignados al grupo (para edición)
-        existing_ids = []
-        if getattr(self, "instance", None) and getattr(self.instance, "pk", None):
-            existing_ids = list(self.instance.permissions.values_list("pk", flat=True))
-
-        return (Permission.objects.select_related("content_type")
-                .filter(combined_filter | Q(pk__in=existing_ids))
-                .order_by("content_type__app_label", "content_type__model", "codename"))
-
-    def _ensure_allowed_qs(self):
-        if not hasattr(self, "allowed_qs"):
-            self.allowed_qs = self._build_allowed_qs()
+        if not hasattr(self, "catalogo"):
+            self.catalogo = catalogo_permisos()
+            self.current_ids = []
+            if getattr(self, "instance", None) and getattr(self.instance, "pk", None):
+                self.current_ids = [getattr(p, "pk", p) for p in self.initial.get("permissions") or []]
+            self.allowed_ids = {pk for pk, p in self.catalogo.items() if p.permitido} | set(self.current_ids)
 
     # ---------- init ----------
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._ensure_allowed_qs()
+        self._ensure_catalogo()
 
-        # --- Construir estructura agrupada por modelo (para template) ---
+        # --- Estructura agrupada por modelo (para template) ---
         grouped = OrderedDict()
-        for perm in self.allowed_qs:
-            ct = perm.content_type
-            # intentar obtener verbose_name del modelo
-            try:
-                model_cls = ct.model_class()
-                if model_cls:
-                    model_verbose = getattr(model_cls._meta, 'verbose_name', ct.model).capitalize()
-                    model_verbose_plural = getattr(model_cls._meta, 'verbose_name_plural', model_verbose + 's').capitalize()
-                else:
-                    model_verbose = ct.model.capitalize()
-                    model_verbose_plural = (ct.model + 's').capitalize()
-            except Exception:
-                model_verbose = ct.model.capitalize()
-                model_verbose_plural = (ct.model + 's').capitalize()
-
-            # deducir acción desde el codename (add_xxx, change_xxx, etc.)
-            codename = perm.codename  # ej "add_activo" o "usuarios" (perm custom)
-            if '_' in codename:
-                action_key = codename.split('_', 1)[0]
-            else:
-                action_key = codename
-
-            action_label = ACTION_LABEL.get(action_key, action_key.capitalize())
-
-            # etiqueta: "Agregar Activo" o para permisos personalizados simplemente mostrar perm.name
-            if '_' in perm.codename:
-                label = f"{action_label} {model_verbose}"
-            else:
-                # permiso personalizado (p.ej. "usuarios") -> usa perm.name
-                label = perm.name
-
-            key = (ct.app_label, ct.model, model_verbose_plural)
-            grouped.setdefault(key, []).append({
-                'perm': perm,
-                'label': label,
-                'action': action_key,
-                'model_verbose': model_verbose,
-                'model_verbose_plural': model_verbose_plural,
-            })
-
+        for perm in self.catalogo.values():
+            if perm.id in self.allowed_ids:
+                grouped.setdefault(perm.clave, []).append({
+                    'perm': perm,
+                    'label': perm.label,
+                    'action': perm.action,
+                    'model_verbose': perm.model_verbose,
+                    'model_verbose_plural': perm.model_verbose_plural,
+                })
         self.allowed_grouped = grouped
-        # --- FIN grouped ---
 
-        # Preselección en edición (tu lógica existente)
+        # Preselección en edición
         if self.instance and self.instance.pk and not self.is_bound:
-            allowed_ids = set(self.allowed_qs.values_list("pk", flat=True))
-            current_ids = list(self.instance.permissions.values_list("pk", flat=True))
-            initial_ids = [str(pk) for pk in current_ids if pk in allowed_ids]
-            self.initial.setdefault("permissions", initial_ids)
+            self.initial["permissions"] = [str(pk) for pk in self.current_ids]
 
     # ---------- propiedad para el template ----------
     @property
@@ -451,14 +416,11 @@ class GroupForm(TailwindFormMixin, forms.ModelForm):
         if "permissions" in self.initial and self.initial["permissions"]:
             return [str(v) for v in self.initial["permissions"]]
 
-        if self.instance and self.instance.pk:
-            return [str(pk) for pk in self.instance.permissions.values_list("pk", flat=True)]
-
-        return []
+        return [str(pk) for pk in self.current_ids]
 
     # ---------- clean ----------
     def clean_permissions(self):
-        self._ensure_allowed_qs()
+        self._ensure_catalogo()
         raw_vals = self.data.getlist(self.add_prefix("permissions")) if self.is_bound else []
         ids = []
         for v in raw_vals:
@@ -467,8 +429,7 @@ class GroupForm(TailwindFormMixin, forms.ModelForm):
             except Exception:
                 continue
 
-        allowed_ids = set(self.allowed_qs.values_list("pk", flat=True))
-        invalid = [v for v in ids if v not in allowed_ids]
+        invalid = [v for v in ids if v not in self.allowed_ids]
         if invalid:
             raise forms.ValidationError(
                 _("Escoja una opción válida. %(invalid)s no es/son parte de las opciones permitidas."),
@@ -511,7 +472,7 @@ from .models import (
 # =========================
 # FORM: Crear ODT (Usuario común)
 # =========================
-class ODTCreateForm(TailwindFormMixin, forms.ModelForm):
+class ODTCreateForm(TailwindFormMixin, OpcionesCacheadasMixin, forms.ModelForm):
     autorizado_por = forms.ModelChoiceField(
         queryset=User.objects.filter(
             groups__name='Jefe Área', 
@@ -520,6 +481,11 @@ class ODTCreateForm(TailwindFormMixin, forms.ModelForm):
         label=_('Será autorizado por'),
         required=True
     )
+    opciones_cacheadas = {
+        'tipo': 'tipos_activos',
+        'maquinaria': 'maquinarias_activas',
+        'autorizado_por': 'jefes_area',
+    }
     
     class Meta:
         model = RegistroODT
@@ -558,7 +524,7 @@ class ODTEditGeneralForm(TailwindFormMixin, forms.ModelForm):
 # =========================
 # FORM: Asignar responsable (Autorizado)
 # =========================
-class ODTAsignarResponsableForm(TailwindFormMixin, forms.ModelForm):
+class ODTAsignarResponsableForm(TailwindFormMixin, OpcionesCacheadasMixin, forms.ModelForm):
     """
     Formulario para que el usuario autorizado asigne un responsable de ejecución.
     """
@@ -585,6 +551,56 @@ class ODTAsignarResponsableForm(TailwindFormMixin, forms.ModelForm):
         model = RegistroODT
         fields = ['responsable_ejecucion', 'tipo_trabajo', 'fecha_programada']
 
+    opciones_cacheadas = {'responsable_ejecucion': 'usuarios_activos'}
+
+
+# =========================
+# FORM: Acciones masivas (listado de ODTs)
+# =========================
+class ODTAccionMasivaForm(TailwindFormMixin, OpcionesCacheadasMixin, forms.Form):
+    """
+    Aplica una acción del flujo a varias ODTs seleccionadas en el listado.
+    """
+    ACCION_CHOICES = [
+        ('asignar', _('Asignar responsable')),
+        ('enviar_solicitud', _('Enviar a solicitud')),
+        ('cerrar', _('Aprobación final')),
+        ('rechazar_aprobacion', _('Rechazar en aprobación')),
+    ]
+    MAX_IDS = 500
+
+    accion = forms.ChoiceField(choices=ACCION_CHOICES, label=_('Acción'))
+    ids = forms.CharField(required=False, widget=forms.MultipleHiddenInput)
+    responsable_ejecucion = forms.ModelChoiceField(
+        queryset=User.objects.filter(is_active=True),
+        label=_('Responsable de ejecución'),
+        required=False,
+        empty_label="Seleccione un responsable"
+    )
+    opciones_cacheadas = {'responsable_ejecucion': 'usuarios_activos'}
+
+    def clean_ids(self):
+        ids = []
+        for v in self.data.getlist(self.add_prefix("ids")):
+            try:
+                ids.append(int(str(v).strip()))
+            except Exception:
+                continue
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise forms.ValidationError(_("Seleccione al menos una ODT."))
+        if len(ids) > self.MAX_IDS:
+            raise forms.ValidationError(
+                _("Puede procesar como máximo %(max)s ODTs por vez."), params={"max": self.MAX_IDS}
+            )
+        return ids
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get("accion") == "asignar" and not cleaned.get("responsable_ejecucion"):
+            self.add_error("responsable_ejecucion", _("Seleccione el responsable a asignar."))
+        return cleaned
+
 
 # =========================
 # FORM: Detalle de Ejecución (Responsable)
@@ -0,0 +1,80 @@
+"""
+Gráficos del reporte PDF con matplotlib orientado a objetos.
+
+- Cada gráfico usa su propia Figure (sin el estado global de pyplot), así
+  que es seguro entre hilos y no deja figuras abiertas en el worker.
+- Se escriben una vez en PDF_CACHE_DIR/graficos/ con el hash de (labels,
+  data, título, colores, formato) como nombre, y se devuelve esa ruta:
+  xhtml2pdf la abre directo (ver recursos.py) en lugar de decodificar un
+  data URI en cada PDF. Los procesos comparten los archivos; además, cada
+  proceso recuerda (LRU) las rutas ya resueltas.
+- formato 'svg' produce un gráfico vectorial (xhtml2pdf lo dibuja con svglib).
+"""
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from matplotlib.figure import Figure
+
+COLORES = ('#3B82F6', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6')
+
+# Subir si cambia el dibujo (invalida los archivos ya escritos)
+VERSION = 1
+
+
+def formato_por_defecto():
+    return getattr(settings, 'REPORTES_GRAFICOS_FORMATO', 'png')
+
+
+def directorio_graficos():
+    return os.path.join(getattr(settings, 'PDF_CACHE_DIR', settings.BASE_DIR / 'cache' / 'pdf'), 'graficos')
+
+
+def _dibujar(labels, data, title, colors, formato, ruta):
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+    ax.pie(data, labels=labels, autopct='%1.1f%%', colors=colors[:len(data)], startangle=90)
+    ax.set_title(title, fontsize=12, fontweight='bold', pad=20)
+    fig.tight_layout()
+
+    directorio = os.path.dirname(ruta)
+    os.makedirs(directorio, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as archivo:
+        fig.savefig(archivo, format=formato, dpi=100, bbox_inches='tight')
+    os.replace(temporal, ruta)
+
+
+@lru_cache(maxsize=128)
+def _torta(labels, data, title, colors, formato, directorio):
+    contenido = repr((VERSION, labels, data, title, colors, formato))
+    ruta = os.path.join(directorio, f'{hashlib.sha256(contenido.encode()).hexdigest()}.{formato}')
+    if not os.path.exists(ruta):
+        _dibujar(labels, data, title, colors, formato, ruta)
+    return ruta
+
+
+def grafico_torta(labels, data, title, colors=None, formato=None):
+    """Gráfico de dona (PNG o SVG): ruta absoluta del archivo, escrito una sola vez."""
+    argumentos = (
+        tuple(str(label) for label in labels),
+        tuple(data),
+        title,
+        tuple(colors or COLORES),
+        formato or formato_por_defecto(),
+    )
+    ruta = _torta(*argumentos, directorio_graficos())
+    if not os.path.exists(ruta):
+        # Alguien vació el directorio después de memorizar la ruta
+        _dibujar(*argumentos, ruta)
+    return ruta
+
+
+def info_cache():
+    return _torta.cache_info()
+
+
+def limpiar_cache():
+    _torta.cache_clear()
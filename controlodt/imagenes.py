@@ -0,0 +1,134 @@
+"""
+Derivados de imágenes (Pillow) generados al subir el archivo.
+
+- Firma -> PNG pequeño con fondo transparente (User.firma_pdf), para PDFs
+  y el detalle de la ODT.
+- Foto de perfil -> miniatura WebP cuadrada (User.imagen_miniatura).
+- Logos de los PDFs (settings.PDF_LOGOS) -> versión reducida en
+  IMAGENES_DERIVADOS_DIR, que el resolutor de PDFs usa en lugar del original.
+`manage.py generar_derivados_imagenes` procesa los archivos ya existentes.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageChops, ImageOps
+
+logger = logging.getLogger(__name__)
+
+FIRMA_MAX = (600, 200)
+AVATAR_LADO = 96
+LOGO_MAX = (400, 400)
+# Píxeles más claros que esto se consideran papel (transparentes) en las firmas
+UMBRAL_FONDO = 235
+
+
+def _abrir(archivo):
+    imagen = Image.open(archivo)
+    return ImageOps.exif_transpose(imagen)
+
+
+def _png(imagen):
+    buffer = BytesIO()
+    imagen.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def firma_png(archivo):
+    """Firma reducida a FIRMA_MAX con el fondo claro transparente."""
+    imagen = _abrir(archivo)
+    imagen.thumbnail(FIRMA_MAX, Image.LANCZOS)
+    tenia_alfa = imagen.mode in ('RGBA', 'LA', 'PA') or 'transparency' in imagen.info
+    imagen = imagen.convert('RGBA')
+    alfa = imagen.convert('L').point(lambda v: 0 if v >= UMBRAL_FONDO else 255)
+    if tenia_alfa:
+        # Conservar la transparencia que ya traía el archivo
+        alfa = ImageChops.darker(imagen.getchannel('A'), alfa)
+    imagen.putalpha(alfa)
+    return _png(imagen)
+
+
+def avatar_webp(archivo):
+    """Miniatura cuadrada AVATAR_LADO x AVATAR_LADO en WebP."""
+    imagen = _abrir(archivo).convert('RGB')
+    imagen = ImageOps.fit(imagen, (AVATAR_LADO, AVATAR_LADO), Image.LANCZOS)
+    buffer = BytesIO()
+    imagen.save(buffer, format='WEBP', quality=80, method=6)
+    return buffer.getvalue()
+
+
+# campo origen -> (generador, extensión); el campo derivado está en User.DERIVADOS_IMAGEN
+GENERADORES = {
+    'firma': (firma_png, 'png'),
+    'imagen': (avatar_webp, 'webp'),
+}
+
+
+def generar_derivados(usuario, campos=tuple(GENERADORES)):
+    """
+    Regenera (o borra, si el original ya no está) los derivados de `campos`
+    y los guarda con un UPDATE directo (sin volver a disparar save()).
+    """
+    cambios = {}
+    for campo in campos:
+        destino = usuario.DERIVADOS_IMAGEN[campo]
+        generador, extension = GENERADORES[campo]
+        origen = getattr(usuario, campo)
+        derivado = getattr(usuario, destino)
+
+        contenido = None
+        if origen:
+            try:
+                with origen.open('rb') as archivo:
+                    contenido = generador(archivo)
+            except (OSError, ValueError, Image.DecompressionBombError):
+                logger.warning('No se pudo generar %s de %s', destino, origen.name, exc_info=True)
+
+        if derivado:
+            derivado.delete(save=False)
+        if contenido:
+            nombre = os.path.splitext(os.path.basename(origen.name))[0]
+            getattr(usuario, destino).save(f'{nombre}.{extension}', ContentFile(contenido), save=False)
+        else:
+            setattr(usuario, destino, None)
+        cambios[destino] = getattr(usuario, destino).name or None
+
+    if cambios:
+        type(usuario)._base_manager.filter(pk=usuario.pk).update(**cambios)
+    return cambios
+
+
+# =========================
+#      LOGOS (STATIC)
+# =========================
+def directorio_derivados():
+    return str(getattr(settings, 'IMAGENES_DERIVADOS_DIR', settings.BASE_DIR / 'cache' / 'derivados'))
+
+
+def ruta_logo_derivado(ruta_static):
+    return os.path.join(directorio_derivados(), 'static', ruta_static)
+
+
+def generar_logo(ruta_static, ruta_absoluta):
+    """
+    Escribe (si falta o está desactualizado) la versión reducida de un logo,
+    en el mismo formato que el original. Devuelve su ruta.
+    """
+    destino = ruta_logo_derivado(ruta_static)
+    if os.path.exists(destino) and os.path.getmtime(destino) >= os.path.getmtime(ruta_absoluta):
+        return destino
+    imagen = _abrir(ruta_absoluta)
+    formato = Image.open(ruta_absoluta).format
+    imagen.thumbnail(LOGO_MAX, Image.LANCZOS)
+
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporal = f'{destino}.{os.getpid()}.tmp'
+    if formato == 'JPEG':
+        imagen.convert('RGB').save(temporal, format='JPEG', quality=85, optimize=True)
+    else:
+        with open(temporal, 'wb') as archivo:
+            archivo.write(_png(imagen))
+    os.replace(temporal, destino)
+    return destino
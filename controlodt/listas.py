@@ -0,0 +1,73 @@
+"""
+Listas de opciones (id, etiqueta) para combos de filtros y formularios,
+guardadas en la caché de Django con una versión por lista (versiones.py).
+
+Los receivers de models.py suben la versión al guardar/borrar líneas,
+equipos, usuarios o grupos; las vistas y OpcionesCacheadasMixin (forms.py)
+leen de aquí en lugar de consultar las tablas en cada request.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from .versiones import subir_version, version
+
+NOMBRE_JEFES = 'Jefe Área'
+
+
+def _tipos():
+    from .models import TipoMaquinaria
+    return TipoMaquinaria.objects.all()
+
+
+def _maquinarias():
+    from .models import Maquinaria
+    return Maquinaria.objects.all()
+
+
+def _usuarios_activos():
+    from .models import User
+    return User.objects.filter(is_active=True)
+
+
+# nombre -> queryset (la etiqueta es str(objeto), como en ModelChoiceField)
+LISTAS = {
+    'tipos': _tipos,
+    'tipos_activos': lambda: _tipos().filter(activo=True),
+    'maquinarias': _maquinarias,
+    'maquinarias_activas': lambda: _maquinarias().filter(activo=True),
+    'usuarios_activos': _usuarios_activos,
+    'jefes_area': lambda: _usuarios_activos().filter(groups__name=NOMBRE_JEFES),
+}
+
+# modelo (app_label.model) -> listas que dependen de sus filas
+LISTAS_POR_MODELO = {
+    'controlodt.tipomaquinaria': ('tipos', 'tipos_activos'),
+    'controlodt.maquinaria': ('maquinarias', 'maquinarias_activas'),
+    'controlodt.user': ('usuarios_activos', 'jefes_area'),
+    'auth.group': ('jefes_area',),
+}
+
+
+def _cache():
+    return caches[getattr(settings, 'LISTAS_CACHE', 'default')]
+
+
+def queryset(nombre):
+    return LISTAS[nombre]()
+
+
+def opciones(nombre):
+    """[(id, etiqueta), ...] de la lista `nombre`."""
+    cache = _cache()
+    clave = f'lista:{nombre}:{version(cache, f"lista:{nombre}")}'
+    valor = cache.get(clave)
+    if valor is None:
+        valor = [(obj.pk, str(obj)) for obj in queryset(nombre)]
+        cache.set(clave, valor, getattr(settings, 'LISTAS_CACHE_TTL', 3600))
+    return valor
+
+
+def invalidar(*nombres):
+    cache = _cache()
+    for nombre in nombres:
+        subir_version(cache, f'lista:{nombre}')
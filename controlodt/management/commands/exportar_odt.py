@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from controlodt.exportacion import TABLAS_CSV, filas_csv, filas_ndjson
+from controlodt.reportes import FiltrosReporte
+
+
+class Command(BaseCommand):
+    help = 'Exporta ODTs (y sus hijos) en CSV o NDJSON, en streaming.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=['csv', 'ndjson'], default='ndjson')
+        parser.add_argument('--tabla', choices=TABLAS_CSV, default='odt',
+                            help='Tabla a exportar en CSV (NDJSON incluye todas).')
+        parser.add_argument('--since', help='Solo ODTs actualizadas después de esta fecha (ISO 8601).')
+        parser.add_argument('--filtro', action='append', default=[], metavar='CAMPO=VALOR',
+                            help='Filtro del reporte (repetible), p. ej. --filtro estado=CERRADA.')
+        parser.add_argument('--salida', help='Archivo de salida (por defecto stdout).')
+
+    def handle(self, *args, **options):
+        params = {}
+        for filtro in options['filtro']:
+            campo, sep, valor = filtro.partition('=')
+            if not sep or campo not in FiltrosReporte.CAMPOS:
+                raise CommandError(f'Filtro inválido: {filtro}')
+            params[campo] = valor
+        if options['since']:
+            params['since'] = options['since']
+
+        filtros = FiltrosReporte(params)
+        try:
+            filtros.since
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        queryset = filtros.queryset()
+        if options['formato'] == 'csv':
+            filas = filas_csv(queryset, options['tabla'])
+        else:
+            filas = filas_ndjson(queryset)
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8', newline='') as destino:
+                destino.writelines(filas)
+        else:
+            for bloque in filas:
+                self.stdout.write(bloque, ending='')
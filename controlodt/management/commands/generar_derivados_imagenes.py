@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from controlodt.imagenes import GENERADORES, generar_derivados
+from controlodt.models import User
+from controlodt.recursos import resolutor
+
+
+class Command(BaseCommand):
+    help = ('Genera los derivados de imagen (firma PNG, miniatura WebP y logos reducidos de los PDFs) '
+            'para los archivos subidos antes de que existieran.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', action='store_true',
+                            help='Regenera también los derivados que ya existen.')
+
+    def handle(self, *args, **options):
+        generados = 0
+        for campo in GENERADORES:
+            destino = User.DERIVADOS_IMAGEN[campo]
+            usuarios = User.objects.exclude(Q(**{f'{campo}__isnull': True}) | Q(**{campo: ''}))
+            if not options['todos']:
+                usuarios = usuarios.filter(Q(**{f'{destino}__isnull': True}) | Q(**{destino: ''}))
+            for usuario in usuarios.iterator():
+                if generar_derivados(usuario, (campo,)).get(destino):
+                    generados += 1
+
+        # El índice de estáticos genera (o reutiliza) los logos reducidos al construirse
+        resolutor.reiniciar()
+        indice = resolutor.indice_static()
+        logos = [r for r in getattr(settings, 'PDF_LOGOS', ()) if r in indice]
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Derivados de usuario generados: {generados}. Logos reducidos: {len(logos)}.'
+        ))
@@ -0,0 +1,83 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+# Bibliotecas de exportación que antes cargaba views.py al importarse
+PESADOS = ('xhtml2pdf', 'matplotlib', 'openpyxl', 'reportlab')
+
+# Módulos que se importan además de las URLs en cada modo
+MODOS = {
+    'perezoso': (),
+    'ansioso': ('controlodt.pdf', 'controlodt.graficos', 'openpyxl'),
+}
+
+SCRIPT = '''
+import json, sys, time
+inicio = time.perf_counter()
+import django
+django.setup()
+from importlib import import_module
+from django.conf import settings
+import_module(settings.ROOT_URLCONF)
+for modulo in sys.argv[1:]:
+    import_module(modulo)
+segundos = time.perf_counter() - inicio
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss / 1024 / 1024 if sys.platform == 'darwin' else rss / 1024  # bytes en macOS, KiB en Linux
+except ImportError:
+    rss = None
+print(json.dumps({
+    'segundos': segundos,
+    'rss_mb': rss,
+    'pesados': [m for m in %r if m in sys.modules],
+}))
+''' % (PESADOS,)
+
+
+def medir(modo, repeticiones=5):
+    """
+    Arranca `repeticiones` intérpretes nuevos que cargan Django y las URLs
+    (como un worker de gunicorn) y devuelve la mediana de tiempo y RSS.
+    """
+    muestras = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, '-c', SCRIPT, *MODOS[modo]],
+            capture_output=True, text=True, check=True, env=os.environ.copy(),
+        )
+        muestras.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+    rss = [m['rss_mb'] for m in muestras if m['rss_mb'] is not None]
+    return {
+        'segundos': statistics.median(m['segundos'] for m in muestras),
+        'rss_mb': statistics.median(rss) if rss else None,
+        'pesados': muestras[-1]['pesados'],
+    }
+
+
+class Command(BaseCommand):
+    help = ('Mide tiempo de importación y memoria (RSS) al arrancar un worker, con los backends '
+            'de exportación cargados bajo demanda (perezoso) o al inicio (ansioso, como antes).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **options):
+        resultados = {modo: medir(modo, options['repeticiones']) for modo in MODOS}
+        for modo, r in resultados.items():
+            rss = f"{r['rss_mb']:.1f} MB" if r['rss_mb'] is not None else 'n/d'
+            self.stdout.write(
+                f"{modo:<9} importación {r['segundos'] * 1000:7.1f} ms   RSS {rss:>9}   "
+                f"cargados: {', '.join(r['pesados']) or '-'}"
+            )
+        antes, despues = resultados['ansioso'], resultados['perezoso']
+        self.stdout.write(self.style.SUCCESS(
+            f"Ahorro por worker: {(antes['segundos'] - despues['segundos']) * 1000:.1f} ms"
+            + (f", {antes['rss_mb'] - despues['rss_mb']:.1f} MB"
+               if antes['rss_mb'] is not None and despues['rss_mb'] is not None else '')
+        ))
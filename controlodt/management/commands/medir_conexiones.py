@@ -0,0 +1,74 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Variables de entorno de core/settings.py para cada modo
+MODOS = {
+    'sin_persistencia': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': ''},
+    'persistente': {'DB_CONN_MAX_AGE': '60', 'DB_POOL': ''},
+    'pool': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': '1'},
+}
+
+SCRIPT = '''
+import json, sys, time
+import django
+django.setup()
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+requests = int(sys.argv[1])
+muestras = []
+for _ in range(requests):
+    inicio = time.perf_counter()
+    # Ciclo de una request como lo ve la base: señales de Django y una consulta
+    request_started.send(sender=None)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+    request_finished.send(sender=None)
+    muestras.append(time.perf_counter() - inicio)
+print(json.dumps(muestras))
+'''
+
+
+def medir(modo, requests):
+    """Latencias (s) de `requests` ciclos de request en un intérprete nuevo con el modo dado."""
+    salida = subprocess.run(
+        [sys.executable, '-c', SCRIPT, str(requests)],
+        capture_output=True, text=True, env={**os.environ, **MODOS[modo]},
+    )
+    if salida.returncode:
+        raise CommandError(f'{modo}: {salida.stderr.strip().splitlines()[-1]}')
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+class Command(BaseCommand):
+    help = ('Mide la latencia por request que agrega la conexión a PostgreSQL (DATABASE_URL) sin '
+            'persistencia, con conexiones persistentes + health checks y con el pool de psycopg.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--modos', nargs='+', choices=list(MODOS), default=list(MODOS))
+
+    def handle(self, *args, **options):
+        if not os.getenv('DATABASE_URL') or settings.DATABASES['default']['ENGINE'] != 'django.db.backends.postgresql':
+            raise CommandError('Defina DATABASE_URL apuntando a un PostgreSQL (p. ej. uno local).')
+
+        for modo in options['modos']:
+            try:
+                muestras = medir(modo, options['requests'])
+            except CommandError as error:
+                self.stderr.write(str(error))
+                continue
+            # La primera request abre la conexión (o el pool) en todos los modos
+            primera, resto = muestras[0], sorted(muestras[1:] or muestras)
+            p95 = resto[max(0, int(len(resto) * 0.95) - 1)]
+            self.stdout.write(
+                f'{modo:<17} primera {primera * 1000:7.2f} ms   mediana {statistics.median(resto) * 1000:7.2f} ms   '
+                f'p95 {p95 * 1000:7.2f} ms'
+            )
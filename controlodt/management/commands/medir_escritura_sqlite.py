@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+PERFILES = ('basico', 'produccion')
+
+SEMILLA = '''
+import django
+django.setup()
+from django.core.management import call_command
+call_command('migrate', verbosity=0)
+from controlodt.models import Maquinaria, TipoMaquinaria, User
+tipo = TipoMaquinaria.objects.create(nombre='Benchmark')
+maquinaria = Maquinaria.objects.create(nombre='Benchmark', codigo='BENCH-01')
+usuario = User.objects.create_user('benchmark@example.com', password='benchmark', nombre='Bench', apellido='Mark')
+print(tipo.pk, maquinaria.pk, usuario.pk)
+'''
+
+TRABAJADOR = '''
+import json, sys, time
+import django
+django.setup()
+from django.db import OperationalError, connection
+from controlodt.models import RegistroODT, User
+
+iteraciones, tipo, maquinaria, usuario = map(int, sys.argv[1:5])
+usuario = User.objects.get(pk=usuario)
+ok = bloqueos = 0
+inicio = time.perf_counter()
+for _ in range(iteraciones):
+    # Alta + tres transiciones, como el flujo de una ODT
+    try:
+        odt = RegistroODT.objects.create(tipo_id=tipo, maquinaria_id=maquinaria, creado_por=usuario,
+                                         titulo='Benchmark', descripcion='Escritura concurrente')
+        odt.transicionar('enviar_solicitud')
+        odt.transicionar('asignar', responsable_ejecucion=usuario)
+        odt.transicionar('iniciar')
+        ok += 1
+    except OperationalError:
+        bloqueos += 1
+connection.close()
+print(json.dumps({'ok': ok, 'bloqueos': bloqueos, 'segundos': time.perf_counter() - inicio}))
+'''
+
+
+def _ejecutar(args, env):
+    salida = subprocess.run([sys.executable, *args], capture_output=True, text=True, env=env)
+    if salida.returncode:
+        raise CommandError(salida.stderr.strip().splitlines()[-1])
+    return salida.stdout
+
+
+def medir(perfil, procesos, iteraciones):
+    """
+    Crea (migra) una base SQLite temporal con el `perfil` dado y lanza `procesos`
+    intérpretes que crean y transicionan `iteraciones` ODTs cada uno a la vez.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, 'SQLITE_PATH': os.path.join(tmp, 'db.sqlite3'), 'SQLITE_PERFIL': perfil}
+        env.pop('DATABASE_URL', None)
+        ids = _ejecutar(['-c', SEMILLA], env).split()
+
+        inicio = time.perf_counter()
+        hijos = [
+            subprocess.Popen([sys.executable, '-c', TRABAJADOR, str(iteraciones), *ids],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, env=env)
+            for _ in range(procesos)
+        ]
+        resultados = []
+        for hijo in hijos:
+            stdout, stderr = hijo.communicate()
+            if hijo.returncode:
+                raise CommandError(stderr.strip().splitlines()[-1])
+            resultados.append(json.loads(stdout.strip().splitlines()[-1]))
+        segundos = time.perf_counter() - inicio
+
+    ok = sum(r['ok'] for r in resultados)
+    return {
+        'ok': ok,
+        'bloqueos': sum(r['bloqueos'] for r in resultados),
+        'segundos': segundos,
+        'odts_por_segundo': ok / segundos if segundos else 0,
+    }
+
+
+class Command(BaseCommand):
+    help = ('Compara el throughput de escritura concurrente (alta y transiciones de ODTs desde varios '
+            'procesos) con SQLite por defecto ("basico") y con el perfil de producción (WAL, IMMEDIATE...).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=4)
+        parser.add_argument('--iteraciones', type=int, default=100,
+                            help='ODTs que crea y transiciona cada proceso.')
+        parser.add_argument('--perfiles', nargs='+', choices=PERFILES, default=list(PERFILES))
+
+    def handle(self, *args, **options):
+        for perfil in options['perfiles']:
+            r = medir(perfil, options['procesos'], options['iteraciones'])
+            self.stdout.write(
+                f"{perfil:<11} {r['odts_por_segundo']:7.1f} ODT/s   completas {r['ok']:>5}   "
+                f"'database is locked' {r['bloqueos']:>4}   {r['segundos']:6.2f} s"
+            )
@@ -0,0 +1,77 @@
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+
+from controlodt.pdf import (
+    PLANTILLA_REPORTE, escribir_pdf, escribir_reporte_por_partes, filas_por_parte, procesos_partes,
+)
+from controlodt.reportes import MESES_NOMBRES
+
+
+def filas_sinteticas(cantidad):
+    fecha = datetime(2024, 1, 1)
+    for i in range(cantidad):
+        yield {
+            'fecha_programada': fecha + timedelta(hours=i),
+            'n_odt': i + 1,
+            'linea': f'Línea {i % 7}',
+            'equipo': f'Equipo {i % 53}',
+            'estado': 'En ejecución',
+            'solicitante': 'Ana Pérez',
+            'revisor': 'Luis Rojas' if i % 2 else '',
+            'aprobador': '',
+            'titulo': f'Mantenimiento preventivo #{i}',
+        }
+
+
+def contexto_sintetico(cantidad):
+    return {
+        'total_registros': cantidad,
+        'total_aprobadas': 0,
+        'total_revision': cantidad,
+        'total_solicitud': 0,
+        'meses_cabecera': MESES_NOMBRES,
+        'reporte_mensual': [{'estado': 'En ejecución', 'meses': [cantidad // 12] * 12, 'total_fila': cantidad}],
+        'año_actual': 2024,
+    }
+
+
+def medir(modo, cantidad, tamano=None, procesos=None):
+    """Segundos y bytes del reporte con `cantidad` filas sintéticas (sin base de datos)."""
+    contexto = contexto_sintetico(cantidad)
+    destino = BytesIO()
+    inicio = time.perf_counter()
+    if modo == 'partes':
+        escribir_reporte_por_partes(contexto, filas_sinteticas(cantidad), destino, tamano, procesos)
+    else:
+        escribir_pdf(PLANTILLA_REPORTE, {**contexto, 'filas': list(filas_sinteticas(cantidad)),
+                                         'inicio': True, 'fin': True}, destino)
+    return time.perf_counter() - inicio, destino.tell()
+
+
+class Command(BaseCommand):
+    help = ('Compara el reporte PDF en una sola pasada contra el render por partes en paralelo '
+            '(filas sintéticas, por defecto 1k/10k/50k).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, nargs='+', default=[1000, 10000, 50000])
+        parser.add_argument('--filas-parte', type=int, default=None,
+                            help='Filas por parte (por defecto PDF_REPORTE_FILAS_PARTE).')
+        parser.add_argument('--procesos', type=int, default=None,
+                            help='Procesos del pool (por defecto PDF_REPORTE_PROCESOS o uno por CPU).')
+        parser.add_argument('--sin-una-pasada', action='store_true',
+                            help='Mide solo el render por partes (la pasada única con 50k filas tarda mucho).')
+
+    def handle(self, *args, **options):
+        tamano = options['filas_parte'] or filas_por_parte()
+        procesos = options['procesos'] or procesos_partes()
+        self.stdout.write(f'Partes de {tamano} filas, {procesos} procesos.')
+        for cantidad in options['filas']:
+            partes, peso = medir('partes', cantidad, tamano, procesos)
+            linea = f'{cantidad:>7} filas   por partes {partes:8.1f} s ({peso / 1024:,.0f} KiB)'
+            if not options['sin_una_pasada']:
+                unica, peso = medir('una_pasada', cantidad)
+                linea += f'   una pasada {unica:8.1f} s ({peso / 1024:,.0f} KiB)   x{unica / partes:.1f}'
+            self.stdout.write(linea)
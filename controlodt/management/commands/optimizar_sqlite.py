@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = ('Mantenimiento de SQLite en producción: PRAGMA optimize (estadísticas del planificador) y '
+            'checkpoint del WAL, que lo vuelca a la base y lo trunca. Ejecutar desde cron o con --intervalo.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--intervalo', type=float, default=0,
+                            help='Segundos entre pasadas (0 = una sola pasada).')
+
+    def handle(self, *args, **options):
+        conexion = connections[options['database']]
+        if conexion.vendor != 'sqlite':
+            raise CommandError(f'La base {options["database"]!r} no es SQLite.')
+
+        try:
+            while True:
+                self.pasada(conexion)
+                if not options['intervalo']:
+                    return
+                time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            pass
+
+    def pasada(self, conexion):
+        with conexion.cursor() as cursor:
+            cursor.execute('PRAGMA optimize')
+            cursor.execute('PRAGMA journal_mode')
+            modo = cursor.fetchone()[0]
+            if modo != 'wal':
+                self.stdout.write(f'Optimizada (journal_mode={modo}, sin WAL que volcar).')
+                return
+            cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            ocupado, paginas, volcadas = cursor.fetchone()
+        if ocupado:
+            self.stdout.write(self.style.WARNING(
+                f'Checkpoint parcial: {volcadas} de {paginas} páginas (hay lectores activos).'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Optimizada; WAL volcado ({volcadas} páginas) y truncado.'))
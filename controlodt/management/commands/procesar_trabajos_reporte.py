@@ -0,0 +1,64 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+
+from controlodt.recursos import resolutor
+from controlodt.trabajos import procesar_pendientes
+
+
+def bucle(intervalo):
+    """Procesa trabajos hasta Ctrl+C; duerme `intervalo` segundos con la cola vacía."""
+    try:
+        while True:
+            # Como entre requests: respeta CONN_MAX_AGE y descarta conexiones caídas
+            close_old_connections()
+            if not procesar_pendientes():
+                time.sleep(intervalo)
+    except KeyboardInterrupt:
+        pass
+
+
+class Command(BaseCommand):
+    help = ('Worker de la cola de exportaciones (PDF/Excel): procesa TrabajoReporte pendientes '
+            'fuera de los workers web. Cada trabajo se corta a los REPORTES_TIEMPO_MAXIMO segundos.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true',
+                            help='Procesa lo pendiente y termina (útil en cron).')
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help='Segundos de espera cuando la cola está vacía.')
+        parser.add_argument('--procesos', type=int, default=1,
+                            help='Procesos worker en paralelo (cada uno toma un trabajo a la vez).')
+
+    def handle(self, *args, **options):
+        # Índice de estáticos listo antes del primer PDF
+        resolutor.indice_static()
+
+        if options['una_vez']:
+            procesados = procesar_pendientes()
+            self.stdout.write(self.style.SUCCESS(f'Trabajos procesados: {procesados}.'))
+            return
+
+        procesos = max(1, options['procesos'])
+        self.stdout.write(f'Esperando trabajos de reporte con {procesos} proceso(s) (Ctrl+C para salir)...')
+        if procesos == 1:
+            bucle(options['intervalo'])
+            return
+
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('--procesos > 1 requiere fork (Unix); ejecute varias instancias del worker.')
+        # Hijos con fork (heredan Django ya configurado), cada uno con su propia
+        # conexión; no son daemon para poder usar el pool del reporte PDF por partes
+        connections.close_all()
+        contexto = multiprocessing.get_context('fork')
+        hijos = [contexto.Process(target=bucle, args=(options['intervalo'],)) for _ in range(procesos)]
+        for hijo in hijos:
+            hijo.start()
+        try:
+            for hijo in hijos:
+                hijo.join()
+        except KeyboardInterrupt:
+            for hijo in hijos:
+                hijo.join()
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from controlodt.models import ResumenODT
+
+
+class Command(BaseCommand):
+    help = 'Recalcula desde cero la tabla ResumenODT usada por los reportes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Alias de la base de datos.')
+
+    def handle(self, *args, **options):
+        filas = ResumenODT.objects.db_manager(options['database']).reconstruir()
+        self.stdout.write(self.style.SUCCESS(f'Resumen ODT reconstruido: {filas} filas.'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from controlodt.busqueda import CAMPOS, borrar_indices, crear_indices, texto_busqueda
+from controlodt.models import User
+
+
+class Command(BaseCommand):
+    help = ('Recalcula User.busqueda y rehace su índice (trigram en PostgreSQL, FTS5 con triggers '
+            'en SQLite), p. ej. tras cargar usuarios con update()/bulk_create o reconstruir la tabla.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        usuarios = list(User._base_manager.using(alias).only('pk', 'busqueda', *CAMPOS))
+        cambiados = [u for u in usuarios if u.busqueda != texto_busqueda(u)]
+        for usuario in cambiados:
+            usuario.busqueda = texto_busqueda(usuario)
+
+        with transaction.atomic(using=alias):
+            User._base_manager.using(alias).bulk_update(cambiados, ['busqueda'], batch_size=500)
+            borrar_indices(connections[alias])
+            crear_indices(connections[alias], User._meta.db_table)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Usuarios actualizados: {len(cambiados)} de {len(usuarios)}. Índice de búsqueda reconstruido.'
+        ))
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-17 19:56
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def sembrar_secuencias(apps, schema_editor):
+    RegistroODT = apps.get_model('controlodt', 'RegistroODT')
+    Secuencia = apps.get_model('controlodt', 'Secuencia')
+    db = schema_editor.connection.alias
+    for campo in ('correlativo', 'n_odt'):
+        maximo = RegistroODT.objects.using(db).aggregate(m=Max(campo))['m'] or 0
+        Secuencia.objects.using(db).update_or_create(nombre=campo, defaults={'valor': maximo})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('controlodt', '0006_alter_registroodt_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Secuencia',
+            fields=[
+                ('nombre', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Nombre')),
+                ('valor', models.PositiveBigIntegerField(default=0, verbose_name='Último valor')),
+            ],
+            options={
+                'verbose_name': 'Secuencia',
+                'verbose_name_plural': 'Secuencias',
+            },
+        ),
+        migrations.RunPython(sembrar_secuencias, migrations.RunPython.noop),
+    ]
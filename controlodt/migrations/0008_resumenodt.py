@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-17 20:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def poblar_resumen(apps, schema_editor):
+    RegistroODT = apps.get_model('controlodt', 'RegistroODT')
+    ResumenODT = apps.get_model('controlodt', 'ResumenODT')
+    db = schema_editor.connection.alias
+    agrupado = (RegistroODT.objects.using(db)
+                .annotate(anio=ExtractYear('creado_en'), mes=ExtractMonth('creado_en'))
+                .values('anio', 'mes', 'estado', 'tipo_id', 'maquinaria_id')
+                .annotate(total=Count('id'))
+                .order_by())
+    ResumenODT.objects.using(db).bulk_create(ResumenODT(**fila) for fila in agrupado)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('controlodt', '0007_secuencia'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenODT',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('anio', models.PositiveSmallIntegerField(verbose_name='Año')),
+                ('mes', models.PositiveSmallIntegerField(verbose_name='Mes')),
+                ('estado', models.CharField(choices=[('BORRADOR', 'Borrador'), ('SOLICITUD', 'En Solicitud'), ('ASIGNADA', 'Asignada'), ('EN_EJECUCION', 'En ejecución'), ('REVISION', 'Revisado'), ('APROBADA', 'Aprobada'), ('RECHAZADA', 'R. por Revisión'), ('RECHAZADAA', 'R. en Aprobación'), ('CERRADA', 'Cerrada')], max_length=20, verbose_name='Estado')),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+                ('maquinaria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='controlodt.maquinaria', verbose_name='Maquinaria')),
+                ('tipo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='controlodt.tipomaquinaria', verbose_name='Tipo')),
+            ],
+            options={
+                'verbose_name': 'Resumen ODT',
+                'verbose_name_plural': 'Resumen ODT',
+                'indexes': [models.Index(fields=['estado', 'anio', 'mes'], name='controlodt__estado_8016bc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('anio', 'mes', 'estado', 'tipo', 'maquinaria'), name='unique_resumen_odt_clave')],
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-17 20:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('controlodt', '0008_resumenodt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoReporte',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('REPORTE_PDF', 'Reporte PDF'), ('REPORTE_EXCEL', 'Reporte Excel'), ('DETALLE_PDF', 'Detalle ODT PDF')], max_length=20, verbose_name='Tipo')),
+                ('clave', models.CharField(max_length=500, verbose_name='Clave')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En proceso'), ('LISTO', 'Listo'), ('ERROR', 'Error')], default='PENDIENTE', max_length=20, verbose_name='Estado')),
+                ('archivo', models.FileField(blank=True, null=True, upload_to='reportes/', verbose_name='Archivo')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Error')),
+                ('creado_en', models.DateTimeField(auto_now_add=True, verbose_name='Creado')),
+                ('iniciado_en', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado')),
+                ('terminado_en', models.DateTimeField(blank=True, null=True, verbose_name='Terminado')),
+                ('expira_en', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Expira')),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='trabajos_reporte', to=settings.AUTH_USER_MODEL, verbose_name='Solicitado por')),
+            ],
+            options={
+                'verbose_name': 'Trabajo de reporte',
+                'verbose_name_plural': 'Trabajos de reporte',
+                'indexes': [models.Index(fields=['estado', 'creado_en'], name='controlodt__estado_71c86b_idx'), models.Index(fields=['tipo', 'clave'], name='controlodt__tipo_1afe78_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado__in', ['PENDIENTE', 'EN_PROCESO'])), fields=('tipo', 'clave'), name='unique_trabajo_reporte_activo')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-17 20:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('controlodt', '0009_trabajoreporte'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='firma_pdf',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='firma/pdf/', verbose_name='Firma para PDF'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='imagen_miniatura',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='perfil/miniaturas/', verbose_name='Miniatura de perfil'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('controlodt', '0010_derivados_imagen_usuario'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trabajoreporte',
+            name='tipo',
+            field=models.CharField(choices=[('REPORTE_PDF', 'Reporte PDF'), ('REPORTE_EXCEL', 'Reporte Excel'), ('DETALLE_PDF', 'Detalle ODT PDF'), ('LOTE_PDF', 'Detalles ODT (PDF unido)'), ('LOTE_ZIP', 'Detalles ODT (ZIP)')], max_length=20, verbose_name='Tipo'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-17 20:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('controlodt', '0011_lotes_detalle_pdf'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registroodt',
+            index=models.Index(fields=['-creado_en', '-id'], name='odt_creado_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroodt',
+            index=models.Index(fields=['creado_por', '-creado_en'], name='odt_creado_por_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroodt',
+            index=models.Index(fields=['responsable_ejecucion', '-creado_en'], name='odt_responsable_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroodt',
+            index=models.Index(fields=['autorizado_por', '-creado_en'], name='odt_autorizado_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroodt',
+            index=models.Index(fields=['revisado_por', '-creado_en'], name='odt_revisado_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 6.0 on 2026-10-17 20:36
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def _normalizar(texto):
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    return ' '.join(''.join(c for c in descompuesto if not unicodedata.combining(c)).lower().split())
+
+
+def crear_indices(apps, schema_editor):
+    from controlodt.busqueda import crear_indices
+    crear_indices(schema_editor.connection, apps.get_model('controlodt', 'User')._meta.db_table)
+
+
+def borrar_indices(apps, schema_editor):
+    from controlodt.busqueda import borrar_indices
+    borrar_indices(schema_editor.connection)
+
+
+def rellenar_busqueda(apps, schema_editor):
+    User = apps.get_model('controlodt', 'User')
+    usuarios = list(User.objects.only('nombre', 'apellido', 'apellidoM', 'email', 'dni'))
+    for usuario in usuarios:
+        usuario.busqueda = _normalizar(' '.join(
+            v or '' for v in (usuario.nombre, usuario.apellido, usuario.apellidoM, usuario.email, usuario.dni)
+        ))
+    User.objects.bulk_update(usuarios, ['busqueda'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('controlodt', '0012_indices_listado_odt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='busqueda',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de búsqueda'),
+        ),
+        migrations.RunPython(rellenar_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-17 21:01
+
+import controlodt.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('controlodt', '0013_busqueda_usuario'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trabajoreporte',
+            name='archivo',
+            field=models.FileField(blank=True, null=True, storage=controlodt.models.AlmacenamientoReportes(), upload_to=controlodt.models.ruta_reporte, verbose_name='Archivo'),
+        ),
+    ]
@@ -1,12 +1,24 @@
+import os
+import uuid
+from collections import Counter
+from typing import NamedTuple
+
 from django.conf import settings
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
-from django.contrib.auth.models import PermissionsMixin
+from django.contrib.auth.models import Group, Permission, PermissionsMixin
+from django.core.files.storage import FileSystemStorage
 from django.core.validators import RegexValidator
-from django.db import models
-from django.db.models import Q
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import Count, F, Max, Prefetch, Q, Sum, sql
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Max
+
+from .busqueda import CAMPOS as CAMPOS_BUSQUEDA, texto_busqueda
+from .recursos import resolutor
 
 
 # --- Manager ---
@@ -45,6 +57,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(_('Correo electrónico'), unique=True, db_index=True)
     imagen = models.ImageField(_('Foto de perfil'), upload_to='perfil/', null=True, blank=True)
     firma = models.ImageField(_('Firma'), upload_to='firma/', null=True, blank=True)  
+    # Derivados generados al subir (ver imagenes.py)
+    imagen_miniatura = models.ImageField(_('Miniatura de perfil'), upload_to='perfil/miniaturas/',
+                                         null=True, blank=True, editable=False)
+    firma_pdf = models.ImageField(_('Firma para PDF'), upload_to='firma/pdf/', null=True, blank=True,
+                                  editable=False)
     nombre = models.CharField(_('Nombre'), max_length=50)
     apellido = models.CharField(_('Apellido paterno'), max_length=50)
     apellidoM = models.CharField(_('Apellido materno'), max_length=50, null=True, blank=True)
@@ -67,6 +84,8 @@ class User(AbstractBaseUser, PermissionsMixin):
         validators=[RegexValidator(r'^[0-9+\-\s()]{6,20}$', _('Formato de teléfono inválido'))],
     )
     direccion = models.CharField(_('Dirección'), max_length=255, null=True, blank=True)
+    # Nombre, apellidos, correo y CI normalizados (ver busqueda.py)
+    busqueda = models.TextField(_('Texto de búsqueda'), default='', blank=True, editable=False)
 
     is_active = models.BooleanField(_('Activo'), default=True)
     is_staff = models.BooleanField(_('Staff'), default=False)
@@ -79,6 +98,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['nombre', 'apellido']
 
+    # imagen original -> derivado
+    DERIVADOS_IMAGEN = {'firma': 'firma_pdf', 'imagen': 'imagen_miniatura'}
+
     class Meta:
         verbose_name = _('Usuario')
         verbose_name_plural = _('Usuarios')
@@ -100,6 +122,34 @@ class User(AbstractBaseUser, PermissionsMixin):
         if self.email:
             self.email = self.email.lower().strip()
 
+    def save(self, *args, **kwargs):
+        # Originales recién subidos (aún sin guardar) o quitados con derivado pendiente
+        cambiados = [
+            campo for campo, derivado in self.DERIVADOS_IMAGEN.items()
+            if (getattr(self, campo) and not getattr(self, campo)._committed)
+            or (not getattr(self, campo) and getattr(self, derivado))
+        ]
+        self.busqueda = texto_busqueda(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(CAMPOS_BUSQUEDA):
+            kwargs['update_fields'] = {*update_fields, 'busqueda'}
+        super().save(*args, **kwargs)
+        if cambiados:
+            from .imagenes import generar_derivados
+            generar_derivados(self, cambiados)
+
+    @property
+    def firma_pdf_url(self):
+        """Firma liviana (PNG transparente) si existe, si no la original."""
+        firma = self.firma_pdf or self.firma
+        return firma.url if firma else ''
+
+    @property
+    def avatar_url(self):
+        """Miniatura WebP si existe, si no la foto original."""
+        imagen = self.imagen_miniatura or self.imagen
+        return imagen.url if imagen else ''
+
     def get_full_name(self):
         parts = [self.nombre, self.apellido, self.apellidoM or '']
         return ' '.join(p for p in parts if p).strip()
@@ -148,6 +198,78 @@ class Maquinaria(models.Model):
         return f'{self.nombre} ({self.codigo})'
 
 
+# =========================
+#        SECUENCIAS
+# =========================
+class SecuenciaManager(models.Manager):
+    def reservar(self, *nombres, cantidad=1, semilla=None):
+        """
+        Reserva `cantidad` números consecutivos en cada secuencia de `nombres`
+        con una sola sentencia (UPDATE ... RETURNING) y devuelve
+        {nombre: primer_numero_reservado}.
+        - Es atómico entre workers: el motor serializa el UPDATE de la fila.
+        - `semilla(nombre, using)` da el valor inicial si la fila aún no existe,
+          leído de la misma base donde se reserva.
+        """
+        if cantidad < 1:
+            raise ValueError(_('La cantidad a reservar debe ser mayor a cero'))
+
+        db = self._db or router.db_for_write(self.model)
+        reservados = self._reservar(db, nombres, cantidad)
+
+        faltantes = [n for n in nombres if n not in reservados]
+        if faltantes:
+            for nombre in faltantes:
+                self.using(db).get_or_create(
+                    nombre=nombre,
+                    defaults={'valor': semilla(nombre, db) if semilla else 0},
+                )
+            reservados.update(self._reservar(db, faltantes, cantidad))
+
+        return reservados
+
+    def _reservar(self, db, nombres, cantidad):
+        connection = connections[db]
+
+        if connection.vendor in ('postgresql', 'sqlite') and connection.features.can_return_columns_from_insert:
+            tabla = connection.ops.quote_name(self.model._meta.db_table)
+            marcadores = ', '.join(['%s'] * len(nombres))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {tabla} SET valor = valor + %s '
+                    f'WHERE nombre IN ({marcadores}) RETURNING nombre, valor',
+                    [cantidad, *nombres],
+                )
+                return {nombre: valor - cantidad + 1 for nombre, valor in cursor.fetchall()}
+
+        # Motores sin UPDATE ... RETURNING: bloqueo de fila + UPDATE
+        with transaction.atomic(using=db):
+            actuales = dict(
+                self.using(db).select_for_update()
+                .filter(nombre__in=nombres).values_list('nombre', 'valor')
+            )
+            self.using(db).filter(nombre__in=actuales).update(valor=F('valor') + cantidad)
+        return {nombre: valor + 1 for nombre, valor in actuales.items()}
+
+
+class Secuencia(models.Model):
+    """
+    Contador con nombre para numeraciones correlativas (correlativo, n_odt).
+    `valor` es el último número entregado.
+    """
+    nombre = models.CharField(_('Nombre'), max_length=50, primary_key=True)
+    valor = models.PositiveBigIntegerField(_('Último valor'), default=0)
+
+    objects = SecuenciaManager()
+
+    class Meta:
+        verbose_name = _('Secuencia')
+        verbose_name_plural = _('Secuencias')
+
+    def __str__(self):
+        return f'{self.nombre} = {self.valor}'
+
+
 # =========================
 #        CHOICES
 # =========================
@@ -168,6 +290,147 @@ class FallaEquipo(models.TextChoices):
 # =========================
 #        REGISTRO ODT
 # =========================
+class Transicion(NamedTuple):
+    origen: tuple
+    destino: str
+
+
+class ResultadoTransicion:
+    """
+    Lo que devuelve RegistroODTQuerySet.transicionar: `aplicadas` son los pks
+    que cambiaron de estado; `rechazadas` ({pk: estado actual} del resto del
+    queryset) solo se consulta si se usa. Es verdadero si se aplicó alguna.
+    """
+    def __init__(self, queryset, aplicadas):
+        self.queryset = queryset
+        self.aplicadas = aplicadas
+
+    def __bool__(self):
+        return bool(self.aplicadas)
+
+    def __len__(self):
+        return len(self.aplicadas)
+
+    @cached_property
+    def rechazadas(self):
+        return dict(self.queryset.exclude(pk__in=self.aplicadas).order_by().values_list('pk', 'estado'))
+
+
+class RegistroODTQuerySet(models.QuerySet):
+    # Usuarios que muestran el detalle y su PDF; los firmantes además listan sus grupos
+    USUARIOS_DETALLE = ('creado_por', 'revisado_por', 'aprobado_por', 'responsable_ejecucion', 'autorizado_por')
+    FIRMANTES = ('creado_por', 'revisado_por', 'aprobado_por')
+
+    # Roles por los que un usuario sin permisos de supervisión ve una ODT
+    ROLES_VISIBILIDAD = ('creado_por', 'responsable_ejecucion', 'autorizado_por', 'revisado_por')
+
+    def visibles_para(self, usuario):
+        """
+        ODTs que `usuario` puede listar. Los supervisores ven todas; el resto,
+        las ODTs donde tiene algún rol: UNION de una subconsulta por rol (cada
+        una usa su índice) en lugar de un OR de cuatro columnas + DISTINCT.
+        """
+        if usuario.is_superuser or usuario.has_perm('controlodt.aprobar_odt') or \
+                usuario.has_perm('controlodt.revisar_odt'):
+            return self
+        primera, *resto = [
+            RegistroODT._base_manager.filter(**{rol: usuario}).order_by().values('pk')
+            for rol in self.ROLES_VISIBILIDAD
+        ]
+        return self.filter(pk__in=primera.union(*resto))
+
+    def con_detalle(self):
+        """
+        Todo lo que usan odt_detail y el PDF de detalle en un número fijo de
+        consultas: un JOIN (tipo, maquinaria, usuarios, detalle y su
+        ejecutor) más repuestos, personal y los grupos de cada firmante.
+        """
+        return self.select_related(
+            'tipo', 'maquinaria', 'detalle_ejecucion__ejecutado_por', *self.USUARIOS_DETALLE,
+        ).prefetch_related(
+            'repuestos', 'personal_necesario',
+            *(Prefetch(f'{usuario}__groups', queryset=Group.objects.only('name')) for usuario in self.FIRMANTES),
+        )
+
+    def transicionar(self, accion, condiciones=None, **cambios):
+        """
+        Aplica la transición `accion` (ver RegistroODT.TRANSICIONES) con un solo
+        UPDATE condicionado al estado de origen:
+            UPDATE ... SET estado=<destino>, <cambios> WHERE <filtros> AND estado = <origen>
+            RETURNING id
+        `condiciones` agrega filtros solo al UPDATE: las filas que no los cumplen
+        cuentan como rechazadas (p. ej. {'creado_por': usuario}).
+        Solo escribe las columnas que cambian. Devuelve un ResultadoTransicion;
+        si es falso, otra petición cambió el estado antes (o no se cumplen los
+        filtros), nunca se sobrescribe en silencio.
+        El resumen se ajusta solo con las filas que devolvió el UPDATE.
+        """
+        transicion = RegistroODT.TRANSICIONES[accion]
+        valores = {'estado': transicion.destino, 'actualizado_en': timezone.now(), **cambios}
+        candidatas = self.filter(**(condiciones or {}))
+        deltas = Counter()
+        aplicadas = []
+        with transaction.atomic(using=self.db):
+            for origen in transicion.origen:
+                pks = candidatas.filter(estado=origen)._update_pks(**valores)
+                if not pks:
+                    continue
+                aplicadas += pks
+                # Las filas quedan bloqueadas por el UPDATE hasta el commit
+                claves = (self.model._base_manager.using(self.db).filter(pk__in=pks).order_by()
+                          .values_list('creado_en', 'tipo_id', 'maquinaria_id'))
+                for creado_en, tipo_id, maquinaria_id in claves:
+                    deltas[ResumenODT.clave(creado_en, origen, tipo_id, maquinaria_id)] -= 1
+                    deltas[ResumenODT.clave(creado_en, transicion.destino, tipo_id, maquinaria_id)] += 1
+            ResumenODT.objects.db_manager(self.db).aplicar(deltas)
+        return ResultadoTransicion(self, aplicadas)
+
+    def _update_pks(self, **valores):
+        """
+        update() que devuelve los pks de las filas que cambió: UPDATE ... RETURNING
+        en PostgreSQL y SQLite; en otros motores bloquea las filas con
+        SELECT ... FOR UPDATE y actualiza exactamente esas.
+        """
+        conexion = connections[self.db]
+        if conexion.vendor not in ('postgresql', 'sqlite') or \
+                not conexion.features.can_return_columns_from_insert:
+            pks = list(self.order_by().select_for_update(of=('self',)).values_list('pk', flat=True))
+            if pks:
+                self.model._base_manager.using(self.db).filter(pk__in=pks).update(**valores)
+            return pks
+
+        consulta = self.query.chain(sql.UpdateQuery)
+        consulta.add_update_values(valores)
+        sentencia, parametros = consulta.get_compiler(self.db).as_sql()
+        pk = conexion.ops.quote_name(self.model._meta.pk.column)
+        with conexion.cursor() as cursor:
+            cursor.execute(f'{sentencia} RETURNING {pk}', parametros)
+            return [fila[0] for fila in cursor.fetchall()]
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Asigna correlativo/n_odt a las ODTs nuevas reservando un bloque por
+        secuencia (una sola sentencia) antes de insertar.
+        """
+        objs = list(objs)
+        for campo in RegistroODT.CAMPOS_SECUENCIA:
+            pendientes = [obj for obj in objs if not getattr(obj, campo)]
+            if not pendientes:
+                continue
+            inicio = Secuencia.objects.db_manager(self.db).reservar(
+                campo, cantidad=len(pendientes), semilla=RegistroODT.semilla_secuencia,
+            )[campo]
+            for numero, obj in enumerate(pendientes, start=inicio):
+                setattr(obj, campo, numero)
+
+        with transaction.atomic(using=self.db):
+            creados = super().bulk_create(objs, *args, **kwargs)
+            ResumenODT.objects.db_manager(self.db).aplicar(
+                Counter(obj.clave_resumen() for obj in creados)
+            )
+        return creados
+
+
 class RegistroODT(models.Model):
     class EstadoODT(models.TextChoices):
         BORRADOR = 'BORRADOR', _('Borrador')
@@ -231,6 +494,23 @@ class RegistroODT(models.Model):
     creado_en = models.DateTimeField(_('Creado'), auto_now_add=True)
     actualizado_en = models.DateTimeField(_('Actualizado'), auto_now=True)
 
+    # Flujo de trabajo: accion -> estados de origen permitidos y estado destino
+    TRANSICIONES = {
+        'enviar_solicitud': Transicion((EstadoODT.BORRADOR,), EstadoODT.SOLICITUD),
+        'asignar': Transicion((EstadoODT.SOLICITUD,), EstadoODT.ASIGNADA),
+        'iniciar': Transicion((EstadoODT.ASIGNADA,), EstadoODT.EN_EJECUCION),
+        'finalizar': Transicion((EstadoODT.EN_EJECUCION,), EstadoODT.REVISION),
+        'aprobar_revision': Transicion((EstadoODT.REVISION,), EstadoODT.APROBADA),
+        'rechazar_revision': Transicion((EstadoODT.REVISION,), EstadoODT.RECHAZADA),
+        'cerrar': Transicion((EstadoODT.APROBADA,), EstadoODT.CERRADA),
+        'rechazar_aprobacion': Transicion((EstadoODT.APROBADA,), EstadoODT.RECHAZADAA),
+    }
+
+    # Campos numerados por la tabla Secuencia (el nombre de la secuencia = nombre del campo)
+    CAMPOS_SECUENCIA = ('correlativo', 'n_odt')
+
+    objects = RegistroODTQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Registro ODT')
         verbose_name_plural = _('Registros ODT')
@@ -248,11 +528,36 @@ class RegistroODT(models.Model):
         indexes = [
             models.Index(fields=['estado']),
             models.Index(fields=['prioridad']),
+            # Listado paginado por cursor (creado_en, id) y visibilidad por rol
+            models.Index(fields=['-creado_en', '-id'], name='odt_creado_id_idx'),
+            models.Index(fields=['creado_por', '-creado_en'], name='odt_creado_por_fecha_idx'),
+            models.Index(fields=['responsable_ejecucion', '-creado_en'], name='odt_responsable_fecha_idx'),
+            models.Index(fields=['autorizado_por', '-creado_en'], name='odt_autorizado_fecha_idx'),
+            models.Index(fields=['revisado_por', '-creado_en'], name='odt_revisado_fecha_idx'),
         ]
 
     def __str__(self):
         return f'ODT #{self.pk} - {self.titulo} [{self.get_estado_display()}]'
 
+    def puede_transicionar(self, accion):
+        return self.estado in self.TRANSICIONES[accion].origen
+
+    def transicionar(self, accion, condiciones=None, **cambios):
+        """
+        Ejecuta la transición sobre esta ODT (un UPDATE ... WHERE pk=? AND estado IN ?).
+        `condiciones` agrega filtros al mismo UPDATE (p. ej. {'creado_por': usuario}).
+        Si se aplica, sincroniza la instancia y devuelve True; si otra petición
+        ganó la carrera devuelve False y la instancia queda sin tocar.
+        """
+        qs = type(self).objects.filter(pk=self.pk, **(condiciones or {}))
+        if not qs.transicionar(accion, **cambios):
+            return False
+
+        self.estado = self.TRANSICIONES[accion].destino
+        for campo, valor in cambios.items():
+            setattr(self, campo, valor)
+        return True
+
     def marcar_revision(self, usuario):
         self.estado = self.EstadoODT.REVISION
         self.save(update_fields=['estado'])
@@ -267,18 +572,123 @@ class RegistroODT(models.Model):
         self.estado = self.EstadoODT.RECHAZADAA
         self.save(update_fields=['aprobado_por', 'estado'])
 
+    @classmethod
+    def semilla_secuencia(cls, campo, using=None):
+        """Valor inicial de una secuencia que aún no existe: el máximo ya usado en `using`."""
+        return cls._default_manager.db_manager(using).aggregate(maximo=Max(campo))['maximo'] or 0
+
+    def clave_resumen(self):
+        return ResumenODT.clave(self.creado_en, self.estado, self.tipo_id, self.maquinaria_id)
+
     def save(self, *args, **kwargs):
-        if not self.correlativo:
-            self.correlativo = (RegistroODT.objects.aggregate(
-                Max('correlativo')
-            )['correlativo__max'] or 0) + 1
+        faltantes = [campo for campo in self.CAMPOS_SECUENCIA if not getattr(self, campo)]
+        if faltantes:
+            numeros = Secuencia.objects.db_manager(kwargs.get('using')).reservar(
+                *faltantes, semilla=self.semilla_secuencia,
+            )
+            for campo, numero in numeros.items():
+                setattr(self, campo, numero)
 
-        if not self.n_odt:
-            self.n_odt = (RegistroODT.objects.aggregate(
-                Max('n_odt')
-            )['n_odt__max'] or 0) + 1
+        using = kwargs.get('using') or router.db_for_write(RegistroODT, instance=self)
+        update_fields = kwargs.get('update_fields')
+        afecta_resumen = update_fields is None or bool(
+            {'estado', 'tipo', 'tipo_id', 'maquinaria', 'maquinaria_id', 'creado_en'} & set(update_fields)
+        )
 
-        super().save(*args, **kwargs)
+        with transaction.atomic(using=using):
+            deltas = Counter()
+            if afecta_resumen and not self._state.adding and self.pk:
+                anterior = (RegistroODT._base_manager.using(using).select_for_update()
+                            .filter(pk=self.pk)
+                            .values_list('creado_en', 'estado', 'tipo_id', 'maquinaria_id').first())
+                if anterior:
+                    deltas[ResumenODT.clave(*anterior)] -= 1
+
+            nuevo = self._state.adding
+            super().save(*args, **kwargs)
+
+            if afecta_resumen or nuevo:
+                deltas[self.clave_resumen()] += 1
+                ResumenODT.objects.db_manager(using).aplicar(deltas)
+
+
+@receiver(post_delete, sender=RegistroODT)
+def _registroodt_post_delete(sender, instance, using, **kwargs):
+    ResumenODT.objects.db_manager(using).aplicar({instance.clave_resumen(): -1})
+
+
+# =========================
+#   RESUMEN ODT (rollup de reportes)
+# =========================
+class ResumenODTManager(models.Manager):
+    def aplicar(self, deltas):
+        """
+        Suma cada delta a su fila del resumen ({clave: delta}, ver ResumenODT.clave).
+        Crea la fila cuando no existe y el delta es positivo.
+        """
+        for clave, delta in deltas.items():
+            if not delta:
+                continue
+            filtro = dict(zip(ResumenODT.CAMPOS_CLAVE, clave))
+            if self.filter(**filtro).update(total=F('total') + delta) or delta < 0:
+                continue
+            try:
+                with transaction.atomic(using=self.db):
+                    self.create(total=delta, **filtro)
+            except IntegrityError:
+                # Otro worker creó la fila entre el UPDATE y el INSERT
+                self.filter(**filtro).update(total=F('total') + delta)
+
+    def reconstruir(self):
+        """Recalcula todo el resumen desde RegistroODT. Devuelve las filas creadas."""
+        agrupado = (RegistroODT.objects.using(self.db)
+                    .annotate(anio=ExtractYear('creado_en'), mes=ExtractMonth('creado_en'))
+                    .values('anio', 'mes', 'estado', 'tipo_id', 'maquinaria_id')
+                    .annotate(total=Count('id'))
+                    .order_by())
+        with transaction.atomic(using=self.db):
+            self.all().delete()
+            return len(self.bulk_create(self.model(**fila) for fila in agrupado))
+
+
+class ResumenODT(models.Model):
+    """
+    Conteo desnormalizado de ODTs por año/mes de creación, estado, línea y equipo.
+    Lo mantienen RegistroODT.save(), las transiciones, bulk_create y el borrado;
+    `manage.py reconstruir_resumen_odt` lo recalcula desde cero.
+    Los UPDATE directos sobre RegistroODT (queryset.update) no lo actualizan.
+    """
+    anio = models.PositiveSmallIntegerField(_('Año'))
+    mes = models.PositiveSmallIntegerField(_('Mes'))
+    estado = models.CharField(_('Estado'), max_length=20, choices=RegistroODT.EstadoODT.choices)
+    tipo = models.ForeignKey(TipoMaquinaria, on_delete=models.CASCADE, related_name='resumenes',
+                             verbose_name=_('Tipo'))
+    maquinaria = models.ForeignKey(Maquinaria, on_delete=models.CASCADE, related_name='resumenes',
+                                   verbose_name=_('Maquinaria'))
+    total = models.IntegerField(_('Total'), default=0)
+
+    CAMPOS_CLAVE = ('anio', 'mes', 'estado', 'tipo_id', 'maquinaria_id')
+
+    objects = ResumenODTManager()
+
+    class Meta:
+        verbose_name = _('Resumen ODT')
+        verbose_name_plural = _('Resumen ODT')
+        constraints = [
+            models.UniqueConstraint(fields=['anio', 'mes', 'estado', 'tipo', 'maquinaria'],
+                                    name='unique_resumen_odt_clave'),
+        ]
+        indexes = [
+            models.Index(fields=['estado', 'anio', 'mes']),
+        ]
+
+    @staticmethod
+    def clave(creado_en, estado, tipo_id, maquinaria_id):
+        fecha = timezone.localtime(creado_en)
+        return (fecha.year, fecha.month, estado, tipo_id, maquinaria_id)
+
+    def __str__(self):
+        return f'{self.anio}-{self.mes:02d} {self.estado}: {self.total}'
 
 
 # =========================
@@ -340,4 +750,251 @@ class PersonalNecesario(models.Model):
         if self.trabajador:
             return f'{self.trabajador} - {self.horas_trabajadas}h'
         return f'{self.categoria or "Sin categoría"} - {self.horas_trabajadas}h'
-        
\ No newline at end of file
+        
+
+# =========================
+#   TRABAJOS DE REPORTE (cola)
+# =========================
+class ColaLlena(Exception):
+    """No se admiten más trabajos: cola global llena o cupo del usuario agotado."""
+    def __init__(self, mensaje, por_usuario=False):
+        super().__init__(mensaje)
+        self.por_usuario = por_usuario
+
+
+class TrabajoReporteManager(models.Manager):
+    def encolar(self, tipo, clave, usuario=None, max_cola=None, max_usuario=None):
+        """
+        Devuelve (trabajo, creado). Reutiliza el trabajo pendiente/en proceso
+        o el resultado vigente con la misma (tipo, clave).
+        Si hay que crear uno nuevo y ya hay `max_cola` trabajos activos (o
+        `max_usuario` del mismo usuario) lanza ColaLlena; el límite es
+        aproximado (dos peticiones simultáneas pueden pasarlo por uno).
+        """
+        Estado = TrabajoReporte.Estado
+        vigente = (self.filter(tipo=tipo, clave=clave)
+                   .filter(Q(estado__in=TrabajoReporte.ACTIVOS) |
+                           Q(estado=Estado.LISTO, expira_en__gt=timezone.now()))
+                   .order_by('-creado_en').first())
+        if vigente:
+            return vigente, False
+        activos = self.filter(estado__in=TrabajoReporte.ACTIVOS)
+        if max_usuario and usuario is not None and activos.filter(solicitado_por=usuario).count() >= max_usuario:
+            raise ColaLlena(f'Ya tiene {max_usuario} exportaciones en curso.', por_usuario=True)
+        if max_cola and activos.count() >= max_cola:
+            raise ColaLlena('La cola de exportaciones está llena.')
+        try:
+            with transaction.atomic(using=self.db):
+                return self.create(tipo=tipo, clave=clave, solicitado_por=usuario), True
+        except IntegrityError:
+            # Otra petición idéntica lo encoló entre el SELECT y el INSERT
+            return self.get(tipo=tipo, clave=clave, estado__in=TrabajoReporte.ACTIVOS), False
+
+    def reclamar(self):
+        """
+        Toma el trabajo pendiente más antiguo con un UPDATE condicional
+        (si otro worker lo tomó antes, prueba con el siguiente).
+        """
+        Estado = TrabajoReporte.Estado
+        while True:
+            pk = (self.filter(estado=Estado.PENDIENTE).order_by('creado_en')
+                  .values_list('pk', flat=True).first())
+            if pk is None:
+                return None
+            if self.filter(pk=pk, estado=Estado.PENDIENTE).update(
+                    estado=Estado.EN_PROCESO, iniciado_en=timezone.now()):
+                return self.get(pk=pk)
+
+    def reencolar_colgados(self, limite):
+        """Devuelve a PENDIENTE los trabajos EN_PROCESO desde hace más de `limite` (timedelta)."""
+        Estado = TrabajoReporte.Estado
+        return self.filter(estado=Estado.EN_PROCESO, iniciado_en__lt=timezone.now() - limite).update(
+            estado=Estado.PENDIENTE, iniciado_en=None)
+
+    def purgar(self):
+        """Borra los trabajos vencidos y sus archivos. Devuelve cuántos borró."""
+        vencidos = list(self.filter(expira_en__lte=timezone.now()))
+        for trabajo in vencidos:
+            if trabajo.archivo:
+                trabajo.archivo.delete(save=False)
+        self.filter(pk__in=[t.pk for t in vencidos]).delete()
+        return len(vencidos)
+
+
+class AlmacenamientoReportes(FileSystemStorage):
+    """
+    Archivos de TrabajoReporte en settings.REPORTES_DIR, fuera de MEDIA_ROOT:
+    no tienen URL pública y solo se sirven por trabajo_reporte_descarga,
+    que revisa el permiso del tipo de reporte.
+    """
+    @property
+    def base_location(self):
+        return settings.REPORTES_DIR
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+    def url(self, name):
+        raise ValueError('Los reportes generados no tienen URL pública.')
+
+
+def ruta_reporte(trabajo, nombre):
+    # Nombre aleatorio: no se deduce de la pk del trabajo
+    return f'{uuid.uuid4().hex}_{nombre}'
+
+
+class TrabajoReporte(models.Model):
+    """
+    Exportación (PDF/Excel) generada fuera del request por
+    `manage.py procesar_trabajos_reporte`. `clave` identifica el contenido
+    (filtros normalizados o ODT + versión): peticiones idénticas comparten trabajo.
+    """
+    class Tipo(models.TextChoices):
+        REPORTE_PDF = 'REPORTE_PDF', _('Reporte PDF')
+        REPORTE_EXCEL = 'REPORTE_EXCEL', _('Reporte Excel')
+        DETALLE_PDF = 'DETALLE_PDF', _('Detalle ODT PDF')
+        LOTE_PDF = 'LOTE_PDF', _('Detalles ODT (PDF unido)')
+        LOTE_ZIP = 'LOTE_ZIP', _('Detalles ODT (ZIP)')
+
+    class Estado(models.TextChoices):
+        PENDIENTE = 'PENDIENTE', _('Pendiente')
+        EN_PROCESO = 'EN_PROCESO', _('En proceso')
+        LISTO = 'LISTO', _('Listo')
+        ERROR = 'ERROR', _('Error')
+
+    ACTIVOS = (Estado.PENDIENTE, Estado.EN_PROCESO)
+
+    tipo = models.CharField(_('Tipo'), max_length=20, choices=Tipo.choices)
+    clave = models.CharField(_('Clave'), max_length=500)
+    estado = models.CharField(_('Estado'), max_length=20, choices=Estado.choices, default=Estado.PENDIENTE)
+    archivo = models.FileField(_('Archivo'), upload_to=ruta_reporte, storage=AlmacenamientoReportes(),
+                               null=True, blank=True)
+    error = models.TextField(_('Error'), blank=True, default='')
+    solicitado_por = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True,
+                                       blank=True, related_name='trabajos_reporte',
+                                       verbose_name=_('Solicitado por'))
+
+    creado_en = models.DateTimeField(_('Creado'), auto_now_add=True)
+    iniciado_en = models.DateTimeField(_('Iniciado'), null=True, blank=True)
+    terminado_en = models.DateTimeField(_('Terminado'), null=True, blank=True)
+    expira_en = models.DateTimeField(_('Expira'), null=True, blank=True, db_index=True)
+
+    objects = TrabajoReporteManager()
+
+    class Meta:
+        verbose_name = _('Trabajo de reporte')
+        verbose_name_plural = _('Trabajos de reporte')
+        constraints = [
+            # Un solo trabajo activo por contenido
+            models.UniqueConstraint(fields=['tipo', 'clave'], condition=Q(estado__in=['PENDIENTE', 'EN_PROCESO']),
+                                    name='unique_trabajo_reporte_activo'),
+        ]
+        indexes = [
+            models.Index(fields=['estado', 'creado_en']),
+            models.Index(fields=['tipo', 'clave']),
+        ]
+
+    @property
+    def listo(self):
+        return self.estado == self.Estado.LISTO
+
+    def __str__(self):
+        return f'{self.get_tipo_display()} #{self.pk} ({self.estado})'
+
+
+# =========================
+#   ARCHIVOS MEDIA EN PDFs
+# =========================
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=RegistroODT)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=RegistroODT)
+def _invalidar_rutas_media(sender, instance, update_fields=None, **kwargs):
+    """Al subir/cambiar/borrar archivos, olvida las rutas MEDIA cacheadas de esos campos."""
+    campos = [f for f in sender._meta.concrete_fields if isinstance(f, models.FileField)]
+    if update_fields is not None:
+        campos = [f for f in campos if f.name in update_fields]
+    if not campos:
+        return
+    if all(isinstance(f.upload_to, str) for f in campos):
+        resolutor.invalidar_media(*(f.upload_to for f in campos))
+    else:
+        resolutor.invalidar_media()
+
+
+# =========================
+#    CACHÉ DE PERMISOS
+# =========================
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def _permisos_m2m_changed(sender, action, using, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _invalidar_permisos(using)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Permission)
+def _permisos_post_delete(sender, using, **kwargs):
+    _invalidar_permisos(using)
+
+
+@receiver(post_save, sender=User)
+def _permisos_usuario_creado(sender, created, using, **kwargs):
+    # SQLite puede reutilizar el id de un usuario borrado
+    if created:
+        _invalidar_permisos(using)
+
+
+def _invalidar_permisos(using):
+    """
+    Ahora y otra vez tras el commit: entre ambos momentos otro worker podría
+    volver a cachear los permisos viejos con la versión nueva.
+    """
+    from .permisos import invalidar_permisos
+    invalidar_permisos()
+    transaction.on_commit(invalidar_permisos, using=using)
+
+
+@receiver(post_migrate)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def _catalogo_permisos(sender, using, **kwargs):
+    """El catálogo de GroupForm (permisos.py) se rehace en cada proceso."""
+    from .permisos import invalidar_catalogo
+    invalidar_catalogo()
+    transaction.on_commit(invalidar_catalogo, using=using)
+
+
+# =========================
+#   LISTAS DE OPCIONES
+# =========================
+@receiver(post_save, sender=TipoMaquinaria)
+@receiver(post_save, sender=Maquinaria)
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=TipoMaquinaria)
+@receiver(post_delete, sender=Maquinaria)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def _listas_guardado(sender, using, update_fields=None, **kwargs):
+    # Los usuarios se guardan en cada login (last_login): solo cuentan nombre y estado
+    if sender is User and update_fields is not None and not set(update_fields) & {*CAMPOS_BUSQUEDA, 'is_active'}:
+        return
+    _invalidar_listas(using, sender)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def _listas_grupos_usuario(sender, action, using, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _invalidar_listas(using, Group)
+
+
+def _invalidar_listas(using, modelo):
+    """Como _invalidar_permisos: ahora y tras el commit."""
+    from .listas import LISTAS_POR_MODELO, invalidar
+    nombres = LISTAS_POR_MODELO[modelo._meta.label_lower]
+    invalidar(*nombres)
+    transaction.on_commit(lambda: invalidar(*nombres), using=using)
@@ -0,0 +1,196 @@
+"""
+Paginación de los listados.
+
+- Por cursor (keyset) sobre (creado_en, id) descendente: en lugar de OFFSET
+  (que recorre y descarta todas las filas anteriores) cada página pide "las
+  N siguientes a la última fila vista", así que la página 1000 cuesta lo
+  mismo que la primera y no hace falta COUNT.
+- Paginador: Paginator de Django con modos de conteo elegibles por vista
+  (settings.PAGINACION_CONTEO), para no pagar un COUNT(*) exacto en cada
+  página de tablas grandes.
+"""
+import base64
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def codificar_cursor(direccion, fila, campo):
+    """'s' (siguientes, más antiguas) o 'a' (anteriores, más nuevas) desde `fila`."""
+    texto = f'{direccion}|{getattr(fila, campo).isoformat()}|{fila.pk}'
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    try:
+        texto = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direccion, fecha, pk = texto.split('|')
+        if direccion not in ('s', 'a'):
+            raise ValueError(direccion)
+        return direccion, datetime.fromisoformat(fecha), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise CursorInvalido(f'Cursor inválido: {cursor!r}') from e
+
+
+class PaginaCursor:
+    def __init__(self, object_list, cursor_siguiente, cursor_anterior):
+        self.object_list = object_list
+        self.cursor_siguiente = cursor_siguiente
+        self.cursor_anterior = cursor_anterior
+
+    @property
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    @property
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def paginar_por_cursor(queryset, cursor, por_pagina, campo='creado_en'):
+    """
+    Página de `queryset` ordenada por (`campo`, pk) descendente a partir de
+    `cursor` (None = primera página). Lanza CursorInvalido si no se puede leer.
+    """
+    direccion, valor, pk = decodificar_cursor(cursor) if cursor else ('s', None, None)
+    if valor is None:
+        orden = [f'-{campo}', '-pk']
+    elif direccion == 's':
+        # campo <= valor va primero para que el índice acote el rango
+        queryset = queryset.filter(Q(**{f'{campo}__lte': valor}),
+                                   Q(**{f'{campo}__lt': valor}) | Q(pk__lt=pk))
+        orden = [f'-{campo}', '-pk']
+    else:
+        queryset = queryset.filter(Q(**{f'{campo}__gte': valor}),
+                                   Q(**{f'{campo}__gt': valor}) | Q(pk__gt=pk))
+        orden = [campo, 'pk']
+
+    filas = list(queryset.order_by(*orden)[:por_pagina + 1])
+    hay_mas = len(filas) > por_pagina
+    filas = filas[:por_pagina]
+    if direccion == 'a':
+        filas.reverse()
+        hay_siguiente, hay_anterior = True, hay_mas
+    else:
+        hay_siguiente, hay_anterior = hay_mas, valor is not None
+
+    if not filas:
+        return PaginaCursor([], None, None)
+    return PaginaCursor(
+        filas,
+        codificar_cursor('s', filas[-1], campo) if hay_siguiente else None,
+        codificar_cursor('a', filas[0], campo) if hay_anterior else None,
+    )
+
+
+# =========================
+#   PAGINATOR CON MODOS DE CONTEO
+# =========================
+class Paginador(Paginator):
+    """
+    Paginator con `modo` de conteo:
+
+    - 'exacto': COUNT(*) de Django.
+    - 'cache': COUNT(*) guardado PAGINACION_CONTEO_TTL segundos bajo `clave`
+      (filtros normalizados); puede quedar desfasado unos segundos.
+    - 'estimado': estimación del planificador (pg_class.reltuples) si la
+      consulta no tiene filtros y la base es PostgreSQL; si no, como 'cache'.
+    - 'sin_conteo': no cuenta; trae una fila de más para saber si hay
+      página siguiente y toma lo visto como total (cota inferior).
+    """
+    MODOS = ('exacto', 'cache', 'estimado', 'sin_conteo')
+
+    def __init__(self, object_list, per_page, modo='exacto', clave=None, **kwargs):
+        if modo not in self.MODOS:
+            raise ValueError(f'Modo de conteo desconocido: {modo}')
+        super().__init__(object_list, per_page, **kwargs)
+        self.modo = modo
+        self.clave = clave
+
+    @cached_property
+    def count(self):
+        if self.modo == 'estimado':
+            estimado = self._estimado()
+            if estimado is not None:
+                return estimado
+        if self.modo in ('cache', 'estimado') and self.clave:
+            ttl = getattr(settings, 'PAGINACION_CONTEO_TTL', 60)
+            return cache.get_or_set(f'conteo:{self.clave}', lambda: Paginator.count.func(self), ttl)
+        return Paginator.count.func(self)
+
+    def _estimado(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where or query.combinator:
+            return None
+        alias = self.object_list.db
+        if connections[alias].vendor != 'postgresql':
+            return None
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                           [self.object_list.model._meta.db_table])
+            fila = cursor.fetchone()
+        # -1: tabla nunca analizada
+        return fila[0] if fila and fila[0] >= 0 else None
+
+    def validate_number(self, number):
+        if self.modo != 'sin_conteo':
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Ese número de página no es un entero')
+        if number < 1:
+            raise EmptyPage('Ese número de página es menor a 1')
+        return number
+
+    def page(self, number):
+        if self.modo != 'sin_conteo':
+            return super().page(number)
+        number = self.validate_number(number)
+        inicio = (number - 1) * self.per_page
+        filas = list(self.object_list[inicio:inicio + self.per_page + 1])
+        if not filas and number > 1:
+            raise EmptyPage('Esa página no contiene resultados')
+        # Con la fila extra num_pages llega a number + 1 y has_next() es True
+        self.__dict__['count'] = inicio + len(filas)
+        return self._get_page(filas[:self.per_page], number, self)
+
+    def get_page(self, number):
+        if self.modo != 'sin_conteo':
+            return super().get_page(number)
+        try:
+            return self.page(number)
+        except (PageNotAnInteger, EmptyPage):
+            return self.page(1)
+
+
+def paginador(vista, queryset, per_page, params, *extra):
+    """
+    Paginador con el modo configurado para `vista` en PAGINACION_CONTEO
+    ('exacto' por defecto). La clave de caché sale de los parámetros GET
+    (sin page/cursor, ordenados) y de `extra` (p. ej. el usuario si el
+    queryset depende de él).
+    """
+    modo = getattr(settings, 'PAGINACION_CONTEO', {}).get(vista, 'exacto')
+    filtros = sorted((k, v) for k in params if k not in ('page', 'cursor') for v in params.getlist(k))
+    clave = hashlib.md5(repr((vista, filtros, extra)).encode()).hexdigest()
+    return Paginador(queryset, per_page, modo=modo, clave=clave)
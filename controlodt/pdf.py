@@ -0,0 +1,350 @@
+"""
+Generación de PDFs con xhtml2pdf, independiente del request: la usan las
+vistas y el worker de trabajos de reporte (ver trabajos.py).
+
+El reporte general con más de PDF_REPORTE_UMBRAL filas se renderiza por
+partes de PDF_REPORTE_FILAS_PARTE filas en un pool de PDF_REPORTE_PROCESOS
+procesos y las partes se unen con pypdf (el costo de maquetar de xhtml2pdf
+crece más que linealmente con el tamaño del documento).
+
+Los lotes de PDFs de detalle (cierre de mes) reutilizan la caché por
+contenido y solo convierten en el pool las ODT que faltan; el HTML se arma
+en el proceso principal con consultas en bloque.
+"""
+import hashlib
+import os
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from datetime import datetime
+from io import BytesIO
+from itertools import islice
+
+from django.conf import settings
+from django.template.loader import get_template
+from xhtml2pdf import pisa
+from xhtml2pdf.config.resources import ResourceAccessPolicy
+from xhtml2pdf.xhtml2pdf_reportlab import PmlImageReader
+
+from .cache_pdf import cache_detalle, huellas_detalle
+from .graficos import directorio_graficos, grafico_torta
+from .imagenes import directorio_derivados
+from .models import RegistroODT
+from .recursos import resolutor
+from .reportes import estadisticas_reporte, filas_reporte_pdf
+
+PLANTILLA_REPORTE = 'reportes/reporte_odt_pdf.html'
+PLANTILLA_DETALLE = 'odt/odt_detalle_pdf.html'
+
+
+class ErrorPDF(Exception):
+    pass
+
+
+# xhtml2pdf nombra cada imagen leída a memoria con el hash de lo que queda
+# sin leer del archivo (los últimos bytes, iguales en todo PNG) y reportlab
+# reutiliza la imagen ya incrustada con ese nombre: los tres gráficos del
+# reporte salían como el primero. Se nombra por el contenido completo.
+_nombre_imagen = PmlImageReader.__str__
+
+
+def _nombre_imagen_por_contenido(self):
+    if isinstance(self.fileName, BytesIO):
+        return f'PmlImageObject_{hashlib.sha256(self.fileName.getvalue()).hexdigest()}'
+    return _nombre_imagen(self)
+
+
+PmlImageReader.__str__ = _nombre_imagen_por_contenido
+
+
+def escribir_pdf(template_src, context, destino):
+    """
+    Renderiza la plantilla y escribe el PDF en `destino` (archivo binario).
+    Las imágenes se resuelven con el resolutor compartido (ver recursos.py).
+    """
+    html_a_pdf(get_template(template_src).render(context), destino, template_src)
+
+
+def politica_recursos():
+    """
+    Qué puede leer xhtml2pdf del disco: por defecto solo el directorio de
+    trabajo, y el resolutor devuelve rutas absolutas fuera de él (gráficos,
+    logos reducidos, firmas, estáticos recolectados).
+    """
+    raices = [directorio_graficos(), directorio_derivados(), settings.MEDIA_ROOT, settings.STATIC_ROOT]
+    for directorio in settings.STATICFILES_DIRS:
+        raices.append(directorio[1] if isinstance(directorio, (list, tuple)) else directorio)
+    return ResourceAccessPolicy(base_dir=settings.BASE_DIR, extra_roots=tuple(str(r) for r in raices if r))
+
+
+def html_a_pdf(html, destino, origen='HTML'):
+    pisa_status = pisa.CreatePDF(html, dest=destino, link_callback=resolutor, resource_policy=politica_recursos())
+    if pisa_status.err:
+        raise ErrorPDF(f'Error al generar PDF desde {origen}')
+
+
+# =========================
+#     DOCUMENTOS ODT
+# =========================
+def contexto_detalle(odt):
+    return {
+        'odt': odt,
+        'title': f'Detalle ODT #{odt.pk}',
+        'pagesize': 'A4',
+    }
+
+
+def escribir_detalle_pdf(odt, destino):
+    escribir_pdf(PLANTILLA_DETALLE, contexto_detalle(odt), destino)
+
+
+def escribir_reporte_pdf(filtros, destino):
+    queryset = filtros.queryset()
+
+    # --- totales y estadísticas (matriz mensual del año actual) ---
+    año_actual = datetime.now().year
+    estadisticas = estadisticas_reporte(filtros, anio=año_actual)
+    total_registros = estadisticas['total_registros']
+    stats_estado = estadisticas['stats_estado']
+    stats_tipo = estadisticas['stats_tipo']
+
+    # Top 5 Maquinarias
+    stats_maquinaria = estadisticas['stats_maquinaria'][:5]
+
+    # --- Gráficos (archivos por contenido, ver graficos.py) ---
+    grafico_estado = None
+    grafico_maquinaria = None
+    grafico_tipo = None
+
+    if total_registros > 0:
+        # Gráfico de estados
+        labels_estado = [item['estado'] for item in stats_estado]
+        data_estado = [item['total'] for item in stats_estado]
+        grafico_estado = grafico_torta(labels_estado, data_estado, 'Distribución por Estado')
+
+        # Gráfico de maquinarias
+        if stats_maquinaria:
+            labels_maq = [item['maquinaria__nombre'] for item in stats_maquinaria]
+            data_maq = [item['total'] for item in stats_maquinaria]
+            grafico_maquinaria = grafico_torta(labels_maq, data_maq, 'Top 5 Maquinarias')
+
+        # Gráfico de tipos
+        if stats_tipo:
+            labels_tipo = [item['tipo__nombre'] for item in stats_tipo]
+            data_tipo = [item['total'] for item in stats_tipo]
+            grafico_tipo = grafico_torta(labels_tipo, data_tipo, 'Líneas de Trabajo')
+
+    context = {
+        'total_registros': total_registros,
+        'total_aprobadas': estadisticas['total_aprobadas'],
+        'total_revision': estadisticas['total_revision'],
+        'total_solicitud': estadisticas['total_solicitud'],
+        'grafico_estado': grafico_estado,
+        'grafico_maquinaria': grafico_maquinaria,
+        'grafico_tipo': grafico_tipo,
+        'meses_cabecera': estadisticas['meses_cabecera'],
+        'reporte_mensual': estadisticas['reporte_mensual'],
+        'año_actual': año_actual,
+    }
+    filas = filas_reporte_pdf(queryset)
+    if total_registros > umbral_partes():
+        escribir_reporte_por_partes(context, filas, destino)
+    else:
+        escribir_pdf(PLANTILLA_REPORTE, {**context, 'filas': filas, 'inicio': True, 'fin': True}, destino)
+
+
+# =========================
+#   REPORTE POR PARTES
+# =========================
+def umbral_partes():
+    return getattr(settings, 'PDF_REPORTE_UMBRAL', 2000)
+
+
+def filas_por_parte():
+    return getattr(settings, 'PDF_REPORTE_FILAS_PARTE', 500)
+
+
+def procesos_partes():
+    return getattr(settings, 'PDF_REPORTE_PROCESOS', None) or os.cpu_count() or 1
+
+
+def _iniciar_proceso():
+    # Con 'spawn'/'forkserver' el proceso hijo arranca sin Django configurado
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _cerrar_pool(pool, completo):
+    """
+    Cierra el pool de partes. Si no se completó (p. ej. TiempoExcedido por el
+    tiempo máximo del trabajo) no espera las partes en curso: cancela las
+    pendientes y termina los procesos hijos para liberar el worker ya.
+    """
+    if completo:
+        pool.shutdown()
+        return
+    procesos = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for proceso in procesos:
+        proceso.terminate()
+
+
+def _renderizar_parte(context):
+    """Una parte del reporte como bytes PDF (se ejecuta en el pool)."""
+    destino = BytesIO()
+    escribir_pdf(PLANTILLA_REPORTE, context, destino)
+    return destino.getvalue()
+
+
+def _partes(context, filas, tamano):
+    filas = iter(filas)
+    bloque = list(islice(filas, tamano))
+    inicio = True
+    while bloque:
+        siguiente = list(islice(filas, tamano))
+        # Encabezado y gráficos en la primera parte, valorización en la última
+        yield {**context, 'filas': bloque, 'inicio': inicio, 'fin': not siguiente}
+        bloque, inicio = siguiente, False
+
+
+def escribir_reporte_por_partes(context, filas, destino, tamano=None, procesos=None):
+    """
+    Renderiza el reporte en partes de `tamano` filas en paralelo y las une
+    en orden en `destino`. Nunca hay más de 2 x `procesos` partes en vuelo.
+    """
+    from pypdf import PdfWriter
+
+    tamano = tamano or filas_por_parte()
+    procesos = procesos or procesos_partes()
+    escritor = PdfWriter()
+    pool = ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso)
+    completo = False
+    try:
+        pendientes = []
+        for parte in _partes(context, filas, tamano):
+            pendientes.append(pool.submit(_renderizar_parte, parte))
+            if len(pendientes) >= procesos * 2:
+                escritor.append(BytesIO(pendientes.pop(0).result()))
+        for futuro in pendientes:
+            escritor.append(BytesIO(futuro.result()))
+        completo = True
+    finally:
+        _cerrar_pool(pool, completo)
+    if not escritor.pages:
+        # Sin filas: documento completo con la tabla vacía
+        return escribir_pdf(PLANTILLA_REPORTE, {**context, 'filas': [], 'inicio': True, 'fin': True}, destino)
+    escritor.write(destino)
+
+
+# =========================
+#   LOTES DE DETALLE
+# =========================
+TAMANO_BLOQUE = 500  # ODT por consulta (pk__in)
+
+
+def _bloques(valores, tamano=TAMANO_BLOQUE):
+    valores = iter(valores)
+    while bloque := list(islice(valores, tamano)):
+        yield bloque
+
+
+def _html_a_bytes(html):
+    """PDF de detalle a partir de su HTML (se ejecuta en el pool)."""
+    destino = BytesIO()
+    html_a_pdf(html, destino, PLANTILLA_DETALLE)
+    return destino.getvalue()
+
+
+def detalles_pdf(pks, procesos=None):
+    """
+    Genera (pk, bytes) del PDF de detalle de cada ODT de `pks`: primero las
+    que están en la caché por contenido, luego las demás a medida que el
+    pool las termina (y quedan en la caché). Omite las ODT que no existen.
+    """
+    cache = cache_detalle()
+    procesos = procesos or procesos_partes()
+    faltantes = {}
+    for bloque in _bloques(pks):
+        for pk, huella in huellas_detalle(bloque).items():
+            ruta = cache.obtener(huella.clave)
+            if ruta is None:
+                faltantes[pk] = huella
+                continue
+            with open(ruta, 'rb') as archivo:
+                yield pk, archivo.read()
+    if not faltantes:
+        return
+
+    def terminar(futuros):
+        for futuro in futuros:
+            pk = en_vuelo.pop(futuro)
+            contenido = futuro.result()
+            cache.guardar(faltantes[pk].clave, BytesIO(contenido))
+            yield pk, contenido
+
+    en_vuelo = {}
+    pool = ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso)
+    completo = False
+    try:
+        plantilla = get_template(PLANTILLA_DETALLE)
+        for bloque in _bloques(faltantes):
+            for odt in RegistroODT.objects.con_detalle().filter(pk__in=bloque):
+                en_vuelo[pool.submit(_html_a_bytes, plantilla.render(contexto_detalle(odt)))] = odt.pk
+                if len(en_vuelo) >= procesos * 2:
+                    listos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                    yield from terminar(listos)
+        yield from terminar(as_completed(list(en_vuelo)))
+        completo = True
+    finally:
+        _cerrar_pool(pool, completo)
+
+
+def escribir_lote_pdf(odts, destino, procesos=None):
+    """
+    Un solo PDF con los detalles de `odts` [(pk, nombre)], en ese orden y con
+    marcadores. Cada parte se agrega apenas le toca; las que llegan antes de
+    su turno esperan en archivos temporales, no en memoria.
+    """
+    from pypdf import PdfWriter
+
+    nombres = dict(odts)
+    escritor = PdfWriter()
+    en_espera = {}
+    siguiente = 0
+
+    def agregar_en_espera(pk):
+        with en_espera.pop(pk) as archivo:
+            archivo.seek(0)
+            escritor.append(archivo, outline_item=nombres[pk])
+
+    try:
+        for pk, contenido in detalles_pdf(nombres, procesos):
+            if pk == odts[siguiente][0]:
+                escritor.append(BytesIO(contenido), outline_item=nombres[pk])
+                siguiente += 1
+            else:
+                en_espera[pk] = tempfile.TemporaryFile()
+                en_espera[pk].write(contenido)
+            while siguiente < len(odts) and odts[siguiente][0] in en_espera:
+                agregar_en_espera(odts[siguiente][0])
+                siguiente += 1
+        # Las ODT que ya no existen no llegan: las siguientes quedaron esperando
+        for pk, _ in odts[siguiente:]:
+            if pk in en_espera:
+                agregar_en_espera(pk)
+    finally:
+        for archivo in en_espera.values():
+            archivo.close()
+    if not escritor.pages:
+        raise ErrorPDF('No hay ODT para exportar con esos filtros.')
+    escritor.write(destino)
+
+
+def escribir_lote_zip(odts, destino, procesos=None):
+    """ZIP con un PDF por ODT de `odts` [(pk, nombre)]; cada entrada se escribe apenas está lista."""
+    nombres = dict(odts)
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_STORED) as archivo_zip:
+        for pk, contenido in detalles_pdf(nombres, procesos):
+            archivo_zip.writestr(f'{nombres[pk]}.pdf', contenido)
@@ -0,0 +1,180 @@
+"""
+Caché de permisos compartida entre workers (settings.AUTHENTICATION_BACKENDS).
+
+ModelBackend arma el conjunto de permisos de cada usuario con consultas a
+Group/Permission en cada request nueva; este backend lo guarda en la caché
+de Django (settings.PERMISOS_CACHE) con una clave que incluye una versión
+global (versiones.py). Cualquier cambio de grupos o permisos (GroupForm,
+UserUpdateForm, admin, shell) sube la versión vía m2m_changed/post_delete
+(ver models.py) y todos los workers dejan de ver las entradas viejas.
+Si PERMISOS_CACHE es una LocMemCache (una por proceso) la subida de versión
+no llegaría a los otros workers, así que el backend no cachea y se comporta
+como ModelBackend.
+
+También guarda, por proceso, el catálogo de permisos que pinta GroupForm
+(etiquetas, agrupación por modelo); se rehace cuando cambia su versión
+(post_migrate o altas/bajas de Permission).
+"""
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Permission
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.translation import gettext_lazy as _
+
+from .versiones import subir_version, version
+
+
+def _cache():
+    return caches[getattr(settings, 'PERMISOS_CACHE', 'default')]
+
+
+def _cache_compartida():
+    """La caché de permisos, o None si es por proceso (LocMemCache)."""
+    cache = _cache()
+    return None if isinstance(cache, LocMemCache) else cache
+
+
+def invalidar_permisos():
+    """Sube la versión: las entradas anteriores quedan huérfanas y expiran solas."""
+    subir_version(_cache(), 'permisos')
+
+
+class BackendPermisosCache(ModelBackend):
+    def _permisos(self, user_obj):
+        """
+        {'usuario': set, 'grupo': set} del usuario activo, desde la caché o
+        calculado con ModelBackend. También llena las cachés por instancia.
+        """
+        if not hasattr(user_obj, '_permisos_cache'):
+            cache = _cache()
+            clave = f"permisos:{version(cache, 'permisos')}:{user_obj.pk}:{int(user_obj.is_superuser)}"
+            permisos = cache.get(clave)
+            if permisos is None:
+                permisos = {
+                    'usuario': super().get_user_permissions(user_obj),
+                    'grupo': super().get_group_permissions(user_obj),
+                }
+                cache.set(clave, permisos, getattr(settings, 'PERMISOS_CACHE_TTL', 3600))
+            user_obj._permisos_cache = permisos
+            user_obj._user_perm_cache = permisos['usuario']
+            user_obj._group_perm_cache = permisos['grupo']
+        return user_obj._permisos_cache
+
+    def _sin_cache(self, user_obj, obj):
+        return (not user_obj.is_active or user_obj.is_anonymous or obj is not None
+                or _cache_compartida() is None)
+
+    def get_user_permissions(self, user_obj, obj=None):
+        if self._sin_cache(user_obj, obj):
+            return super().get_user_permissions(user_obj, obj)
+        return self._permisos(user_obj)['usuario']
+
+    def get_group_permissions(self, user_obj, obj=None):
+        if self._sin_cache(user_obj, obj):
+            return super().get_group_permissions(user_obj, obj)
+        return self._permisos(user_obj)['grupo']
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if self._sin_cache(user_obj, obj):
+            return super().get_all_permissions(user_obj, obj)
+        if not hasattr(user_obj, '_perm_cache'):
+            permisos = self._permisos(user_obj)
+            user_obj._perm_cache = permisos['usuario'] | permisos['grupo']
+        return user_obj._perm_cache
+
+
+# =========================
+#   CATÁLOGO DE PERMISOS
+# =========================
+EXCLUDED_APPS = {"admin", "contenttypes", "sessions"}
+
+ACTION_LABEL = {
+    'add': _('Agregar'),
+    'change': _('Modificar'),
+    'delete': _('Eliminar'),
+    'view': _('Ver'),
+    # agrega mapeos para permisos personalizados si los tienes
+    # 'usuarios': _('Permiso para usuarios'),
+}
+
+
+class PermisoCatalogo(NamedTuple):
+    id: int
+    codename: str
+    app_label: str
+    label: str
+    action: str
+    model_verbose: str
+    model_verbose_plural: str
+    clave: tuple  # (app_label, model, model_verbose_plural): agrupación del formulario
+    permitido: bool  # según GROUP_PERMISSION_APPS / EXCLUDED_APPS
+
+
+_catalogo = {'version': None, 'permisos': None}
+_catalogo_lock = threading.Lock()
+
+
+def _permitido(app_label, model):
+    """
+    Apps de settings.GROUP_PERMISSION_APPS (o todas menos EXCLUDED_APPS) y
+    siempre auth.group, para poder gestionar grupos.
+    """
+    if app_label == 'auth' and model == 'group':
+        return True
+    allowed_apps = getattr(settings, "GROUP_PERMISSION_APPS", None)
+    if allowed_apps:
+        return app_label in allowed_apps
+    return app_label not in EXCLUDED_APPS
+
+
+def _construir_catalogo():
+    permisos = OrderedDict()
+    verbose = {}
+    for perm in (Permission.objects.select_related("content_type")
+                 .order_by("content_type__app_label", "content_type__model", "codename")):
+        ct = perm.content_type
+        if ct.pk not in verbose:
+            model_cls = ct.model_class()
+            if model_cls:
+                model_verbose = str(model_cls._meta.verbose_name).capitalize()
+                model_verbose_plural = str(model_cls._meta.verbose_name_plural).capitalize()
+            else:
+                model_verbose = ct.model.capitalize()
+                model_verbose_plural = (ct.model + 's').capitalize()
+            verbose[ct.pk] = (model_verbose, model_verbose_plural)
+        model_verbose, model_verbose_plural = verbose[ct.pk]
+
+        # acción desde el codename (add_xxx, change_xxx...); los permisos
+        # personalizados (p.ej. "usuarios") se muestran con su nombre
+        action_key = perm.codename.split('_', 1)[0]
+        if '_' in perm.codename:
+            label = f"{ACTION_LABEL.get(action_key, action_key.capitalize())} {model_verbose}"
+        else:
+            label = perm.name
+
+        permisos[perm.pk] = PermisoCatalogo(
+            id=perm.pk, codename=perm.codename, app_label=ct.app_label, label=label, action=action_key,
+            model_verbose=model_verbose, model_verbose_plural=model_verbose_plural,
+            clave=(ct.app_label, ct.model, model_verbose_plural), permitido=_permitido(ct.app_label, ct.model),
+        )
+    return permisos
+
+
+def catalogo_permisos():
+    """{id: PermisoCatalogo} de todos los permisos, en el orden del formulario de grupos."""
+    actual = version(_cache(), 'catalogo_permisos')
+    if _catalogo['version'] != actual:
+        with _catalogo_lock:
+            if _catalogo['version'] != actual:
+                _catalogo['permisos'] = _construir_catalogo()
+                _catalogo['version'] = actual
+    return _catalogo['permisos']
+
+
+def invalidar_catalogo():
+    subir_version(_cache(), 'catalogo_permisos')
@@ -0,0 +1,122 @@
+"""
+Resolución de URLs de imágenes (STATIC/MEDIA) a rutas absolutas para xhtml2pdf.
+
+- STATIC: índice URL -> ruta construido una sola vez por proceso con los
+  finders (misma precedencia que finders.find) y luego STATIC_ROOT; los
+  logos de settings.PDF_LOGOS apuntan a su versión reducida.
+- MEDIA: caché LRU acotada de los archivos encontrados en disco (los
+  faltantes se vuelven a buscar cada vez); los modelos con archivos la
+  invalidan al guardarse o borrarse (ver models.py).
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+logger = logging.getLogger(__name__)
+
+
+class ResolutorRecursos:
+    def __init__(self, max_media=None):
+        self.max_media = max_media
+        self._static = None
+        self._media = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ===== STATIC =====
+    def indice_static(self):
+        """{ruta relativa: ruta absoluta}; se arma en el primer uso."""
+        if self._static is None:
+            with self._lock:
+                if self._static is None:
+                    self._static = self._construir_indice_static()
+        return self._static
+
+    def _construir_indice_static(self):
+        indice = {}
+        # 1️⃣ Desarrollo (STATICFILES_DIRS y apps), el primero gana como en finders.find
+        for finder in finders.get_finders():
+            for ruta, storage in finder.list([]):
+                if getattr(storage, 'prefix', None):
+                    ruta_url = f'{storage.prefix}/{ruta}'
+                else:
+                    ruta_url = ruta
+                indice.setdefault(ruta_url.replace(os.sep, '/'), storage.path(ruta))
+        # 2️⃣ Producción (STATIC_ROOT, incluye nombres con hash de collectstatic)
+        if settings.STATIC_ROOT and os.path.isdir(settings.STATIC_ROOT):
+            raiz = str(settings.STATIC_ROOT)
+            for carpeta, _, archivos in os.walk(raiz):
+                for nombre in archivos:
+                    absoluta = os.path.join(carpeta, nombre)
+                    indice.setdefault(os.path.relpath(absoluta, raiz).replace(os.sep, '/'), absoluta)
+        # 3️⃣ Logos de los PDFs: usar la versión reducida (ver imagenes.py)
+        logos = [r for r in getattr(settings, 'PDF_LOGOS', ()) if r in indice]
+        if logos:
+            from .imagenes import generar_logo
+            for ruta in logos:
+                try:
+                    indice[ruta] = generar_logo(ruta, indice[ruta])
+                except OSError:
+                    logger.warning('No se pudo reducir el logo %s', ruta, exc_info=True)
+        return indice
+
+    # ===== MEDIA =====
+    def _ruta_media(self, relativa):
+        limite = self.max_media or getattr(settings, 'PDF_MEDIA_CACHE', 1024)
+        with self._lock:
+            if relativa in self._media:
+                self._media.move_to_end(relativa)
+                return self._media[relativa]
+        ruta = os.path.join(settings.MEDIA_ROOT, relativa)
+        if not os.path.isfile(ruta):
+            # Los faltantes no se recuerdan: el worker de PDFs no recibe las
+            # invalidaciones del proceso web que luego sube el archivo
+            return None
+        with self._lock:
+            self._media[relativa] = ruta
+            while len(self._media) > limite:
+                self._media.popitem(last=False)
+        return ruta
+
+    def invalidar_media(self, *prefijos):
+        """Olvida las rutas MEDIA que empiezan con alguno de los prefijos (todas si no hay)."""
+        with self._lock:
+            if not prefijos:
+                self._media.clear()
+                return
+            for relativa in [r for r in self._media if r.startswith(prefijos)]:
+                del self._media[relativa]
+
+    def reiniciar(self):
+        with self._lock:
+            self._static = None
+            self._media.clear()
+
+    # ===== link_callback =====
+    def __call__(self, uri, rel=None):
+        """
+        link_callback de xhtml2pdf: ruta absoluta del recurso o `uri` sin
+        cambios (data:, http:, o archivo inexistente; xhtml2pdf lo omite).
+        """
+        ruta_uri = unquote(urlparse(uri).path)
+
+        if settings.MEDIA_URL and ruta_uri.startswith(settings.MEDIA_URL):
+            ruta = self._ruta_media(ruta_uri[len(settings.MEDIA_URL):].lstrip('/'))
+        elif settings.STATIC_URL and ruta_uri.startswith(settings.STATIC_URL):
+            ruta = self.indice_static().get(ruta_uri[len(settings.STATIC_URL):].lstrip('/'))
+        elif os.path.isabs(ruta_uri) and os.path.isfile(ruta_uri):
+            ruta = ruta_uri
+        else:
+            return uri
+
+        if ruta is None:
+            logger.warning('Recurso no encontrado para PDF: %s', uri)
+            return uri
+        return ruta
+
+
+resolutor = ResolutorRecursos()
@@ -0,0 +1,223 @@
+"""
+Consultas compartidas por los reportes de ODT (HTML, PDF y Excel).
+
+- FiltrosReporte interpreta una sola vez los filtros GET del reporte.
+- estadisticas_reporte() calcula todos los agregados con UNA sentencia
+  agrupada: desde ResumenODT si los filtros lo permiten, si no en vivo
+  sobre RegistroODT.
+- filas_reporte_pdf() trae la tabla del reporte PDF como dicts planos
+  (sin objetos relacionados), aptos para enviar a otros procesos.
+"""
+from collections import Counter
+from datetime import datetime, time
+from functools import cached_property
+from urllib.parse import urlencode
+
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .busqueda import ids_usuarios
+from .models import RegistroODT, ResumenODT
+
+MESES_NOMBRES = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
+
+DIMENSIONES = ('anio', 'mes', 'estado', 'tipo__nombre', 'maquinaria__nombre')
+
+
+class FiltrosReporte:
+    """
+    Filtros GET de los reportes, normalizados (sin vacíos ni espacios).
+    """
+    CAMPOS = (
+        'n_odt', 'maquinaria', 'tipo_maquinaria', 'prioridad', 'estado',
+        'creado_por', 'revisado_por', 'aprobado_por', 'fecha_inicio', 'fecha_fin', 'since',
+    )
+    # Filtros que ResumenODT puede resolver -> campo del resumen
+    CAMPOS_RESUMEN = {'maquinaria': 'maquinaria_id', 'tipo_maquinaria': 'tipo_id', 'estado': 'estado'}
+    # Filtros de texto sobre un usuario relacionado (nombre, apellidos, correo o CI)
+    CAMPOS_USUARIO = ('creado_por', 'revisado_por', 'aprobado_por')
+
+    def __init__(self, params):
+        self.valores = {}
+        for campo in self.CAMPOS:
+            valor = (params.get(campo) or '').strip()
+            if valor:
+                self.valores[campo] = valor
+        # Selección explícita (?ids=1,2 o ?ids=1&ids=2, p. ej. desde odt_list), ordenada
+        listas = params.getlist('ids') if hasattr(params, 'getlist') else [params.get('ids') or '']
+        ids = sorted({int(p) for lista in listas for p in lista.split(',') if p.strip().isdigit()})
+        if ids:
+            self.valores['ids'] = ','.join(map(str, ids))
+
+    def __getitem__(self, campo):
+        return self.valores.get(campo, '')
+
+    def clave(self):
+        """Representación canónica (orden fijo) para usar como clave de caché/trabajos."""
+        return urlencode(sorted(self.valores.items()))
+
+    @cached_property
+    def since(self):
+        """
+        `since` (ISO 8601, fecha o fecha/hora) como datetime aware, o None.
+        Lanza ValueError si no se puede interpretar (las vistas responden 400).
+        """
+        valor = self['since']
+        if not valor:
+            return None
+        fecha = parse_datetime(valor)
+        if fecha is None:
+            dia = parse_date(valor)
+            if dia is None:
+                raise ValueError(f'Fecha inválida para since: {valor!r}')
+            fecha = datetime.combine(dia, time.min)
+        if timezone.is_naive(fecha):
+            fecha = timezone.make_aware(fecha)
+        return fecha
+
+    @property
+    def usa_resumen(self):
+        return set(self.valores) <= set(self.CAMPOS_RESUMEN)
+
+    def aplicar(self, queryset):
+        v = self.valores
+        if 'ids' in v:
+            queryset = queryset.filter(pk__in=v['ids'].split(','))
+        if 'n_odt' in v:
+            queryset = queryset.filter(n_odt=v['n_odt'])
+        if 'maquinaria' in v:
+            queryset = queryset.filter(maquinaria_id=v['maquinaria'])
+        if 'tipo_maquinaria' in v:
+            queryset = queryset.filter(tipo_id=v['tipo_maquinaria'])
+        if 'prioridad' in v:
+            queryset = queryset.filter(prioridad=v['prioridad'])
+        if 'estado' in v:
+            queryset = queryset.filter(estado=v['estado'])
+        # Nombre -> subconsulta de ids (índice de búsqueda); se filtra por la FK en la misma consulta
+        ids = {}
+        for campo in self.CAMPOS_USUARIO:
+            if campo in v:
+                if v[campo] not in ids:
+                    ids[v[campo]] = ids_usuarios(v[campo], using=queryset.db)
+                queryset = queryset.filter(**{f'{campo}_id__in': ids[v[campo]]})
+        if 'fecha_inicio' in v and 'fecha_fin' in v:
+            queryset = queryset.filter(creado_en__range=[v['fecha_inicio'], v['fecha_fin']])
+        if 'since' in v:
+            # Incremental: solo lo modificado después de `since`
+            queryset = queryset.filter(actualizado_en__gt=self.since)
+        return queryset
+
+    def queryset(self):
+        return self.aplicar(RegistroODT.objects.all())
+
+
+def estadisticas_reporte(filtros, anio=None):
+    """
+    Totales, distribución por estado/tipo/maquinaria y matriz estado x mes
+    por año, a partir de una sola consulta agrupada por
+    (año, mes, estado, tipo, maquinaria).
+    `anio` elige el año de `reporte_mensual` (por defecto el actual);
+    `reporte_anual` trae la matriz de cada año con datos.
+    """
+    if filtros.usa_resumen:
+        base = ResumenODT.objects.filter(total__gt=0, **{
+            campo: filtros[param] for param, campo in FiltrosReporte.CAMPOS_RESUMEN.items() if filtros[param]
+        })
+        filas = base.values(*DIMENSIONES).annotate(total=Sum('total')).order_by()
+    else:
+        filas = (filtros.queryset()
+                 .annotate(anio=ExtractYear('creado_en'), mes=ExtractMonth('creado_en'))
+                 .values(*DIMENSIONES).annotate(total=Count('id')).order_by())
+
+    return _armar_estadisticas(filas, anio or timezone.localdate().year)
+
+
+def _armar_estadisticas(filas, anio):
+    por_estado = Counter()
+    por_tipo = Counter()
+    por_maquinaria = Counter()
+    matrices = {}
+    for fila in filas:
+        total = fila['total']
+        por_estado[fila['estado']] += total
+        por_tipo[fila['tipo__nombre']] += total
+        por_maquinaria[fila['maquinaria__nombre']] += total
+        matriz = matrices.setdefault(fila['anio'], {})
+        matriz.setdefault(fila['estado'], [0] * 12)[fila['mes'] - 1] += total
+
+    total_registros = sum(por_estado.values())
+
+    def porcentaje(total):
+        return (total / total_registros * 100) if total_registros > 0 else 0
+
+    def filas_matriz(matriz):
+        return [
+            {
+                'estado': nombre,
+                'meses': matriz.get(cod, [0] * 12),
+                'total_fila': sum(matriz.get(cod, [])),
+            }
+            for cod, nombre in RegistroODT.EstadoODT.choices
+        ]
+
+    estados = dict(RegistroODT.EstadoODT.choices)
+    return {
+        'total_registros': total_registros,
+        'total_aprobadas': por_estado[RegistroODT.EstadoODT.CERRADA],
+        'total_revision': por_estado[RegistroODT.EstadoODT.EN_EJECUCION],
+        'total_solicitud': por_estado[RegistroODT.EstadoODT.SOLICITUD],
+        'stats_estado': [
+            {'estado': estados.get(estado, estado), 'total': total, 'porcentaje': porcentaje(total)}
+            for estado, total in por_estado.most_common()
+        ],
+        'stats_tipo': [
+            {'tipo__nombre': nombre, 'total': total, 'porcentaje': porcentaje(total)}
+            for nombre, total in por_tipo.most_common()
+        ],
+        'stats_maquinaria': [
+            {'maquinaria__nombre': nombre, 'total': total, 'porcentaje': porcentaje(total)}
+            for nombre, total in por_maquinaria.most_common()
+        ],
+        'reporte_anual': [
+            {'anio': a, 'filas': filas_matriz(matrices[a])}
+            for a in sorted(matrices, reverse=True)
+        ] or [{'anio': anio, 'filas': filas_matriz({})}],
+        'reporte_mensual': filas_matriz(matrices.get(anio, {})),
+        'meses_cabecera': MESES_NOMBRES,
+    }
+
+
+# =========================
+#   FILAS DEL REPORTE PDF
+# =========================
+USUARIOS_FILA = {'creado_por': 'solicitante', 'revisado_por': 'revisor', 'aprobado_por': 'aprobador'}
+CAMPOS_NOMBRE = ('nombre', 'apellido', 'apellidoM')
+
+
+def _nombre_completo(fila, usuario):
+    # Igual que User.get_full_name()
+    return ' '.join(p for p in (fila[f'{usuario}__{c}'] for c in CAMPOS_NOMBRE) if p).strip()
+
+
+def filas_reporte_pdf(queryset, tamano=2000):
+    """
+    Filas de la tabla del reporte PDF en una sola consulta (sin N+1 por
+    maquinaria y usuarios). Cada fila es un dict de valores simples.
+    """
+    estados = dict(RegistroODT.EstadoODT.choices)
+    campos = ['fecha_programada', 'n_odt', 'titulo', 'estado', 'maquinaria__nombre', 'tipo__nombre']
+    campos += [f'{usuario}__{c}' for usuario in USUARIOS_FILA for c in CAMPOS_NOMBRE]
+    for fila in queryset.values(*campos).iterator(chunk_size=tamano):
+        datos = {
+            'fecha_programada': fila['fecha_programada'],
+            'n_odt': fila['n_odt'],
+            'linea': fila['tipo__nombre'],
+            'equipo': fila['maquinaria__nombre'],
+            'estado': str(estados.get(fila['estado'], fila['estado'])),
+            'titulo': fila['titulo'],
+        }
+        for usuario, clave in USUARIOS_FILA.items():
+            datos[clave] = _nombre_completo(fila, usuario)
+        yield datos
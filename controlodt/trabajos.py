@@ -0,0 +1,242 @@
+"""
+Cola de exportaciones en base de datos (TrabajoReporte).
+
+- Las vistas encolan y responden al instante con la URL de estado/descarga.
+- `manage.py procesar_trabajos_reporte` toma los trabajos, escribe el
+  archivo en REPORTES_DIR (privado, con nombre aleatorio) y lo deja
+  disponible REPORTES_TTL segundos.
+- Control de admisión: con REPORTES_COLA_MAXIMA trabajos activos (o
+  REPORTES_COLA_POR_USUARIO del mismo usuario) no se encolan más (503/429),
+  y cada trabajo se corta a los REPORTES_TIEMPO_MAXIMO segundos.
+- metricas() resume espera en cola y tiempo de render para dimensionar workers.
+"""
+import logging
+import shutil
+import signal
+import statistics
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Count
+from django.http import QueryDict
+from django.utils import timezone
+
+from .models import RegistroODT, TrabajoReporte
+from .reportes import FiltrosReporte
+
+logger = logging.getLogger(__name__)
+
+Tipo = TrabajoReporte.Tipo
+
+
+def ttl():
+    return timedelta(seconds=getattr(settings, 'REPORTES_TTL', 3600))
+
+
+def tiempo_maximo():
+    return timedelta(seconds=getattr(settings, 'REPORTES_TIEMPO_MAXIMO', 900))
+
+
+def encolar(tipo, clave, usuario=None):
+    """TrabajoReporte.objects.encolar con los límites de admisión de settings (puede lanzar ColaLlena)."""
+    return TrabajoReporte.objects.encolar(
+        tipo, clave, usuario=usuario,
+        max_cola=getattr(settings, 'REPORTES_COLA_MAXIMA', 50),
+        max_usuario=getattr(settings, 'REPORTES_COLA_POR_USUARIO', 3),
+    )
+
+
+# =========================
+#   CLAVES POR TIPO
+# =========================
+def clave_detalle(pk, huella):
+    """ODT + huella de contenido (cache_pdf.huella_detalle): si algo cambia, la clave cambia."""
+    return f'{pk}@{huella.clave}'
+
+
+def _escribir_reporte_pdf(clave, destino):
+    from .pdf import escribir_reporte_pdf
+    escribir_reporte_pdf(FiltrosReporte(QueryDict(clave)), destino)
+
+
+def _escribir_reporte_excel(clave, destino):
+    from .exportacion import escribir_excel
+    escribir_excel(FiltrosReporte(QueryDict(clave)).queryset(), destino)
+
+
+def _escribir_detalle_pdf(clave, destino):
+    from .cache_pdf import cache_detalle, huella_detalle
+    from .pdf import escribir_detalle_pdf
+
+    pk = int(clave.split('@', 1)[0])
+    cache = cache_detalle()
+    # Huella actual (los datos pueden haber cambiado desde que se encoló)
+    huella = huella_detalle(pk)
+    if huella is None:
+        raise RegistroODT.DoesNotExist(f'La ODT {pk} ya no existe.')
+    ruta = cache.obtener(huella.clave)
+    if ruta is None:
+        inicio = destino.tell()
+        escribir_detalle_pdf(RegistroODT.objects.con_detalle().get(pk=pk), destino)
+        destino.seek(inicio)
+        cache.guardar(huella.clave, destino)
+    else:
+        with open(ruta, 'rb') as origen:
+            shutil.copyfileobj(origen, destino)
+
+
+def _odts_lote(clave):
+    """[(pk, nombre de archivo)] de las ODT del lote, por número de ODT."""
+    filas = FiltrosReporte(QueryDict(clave)).queryset().order_by('n_odt', 'pk').values_list('pk', 'n_odt')
+    return [(pk, f'ODT_{n_odt:03d}' if n_odt is not None else f'ODT_id{pk}') for pk, n_odt in filas]
+
+
+def _escribir_lote_pdf(clave, destino):
+    from .pdf import escribir_lote_pdf
+    escribir_lote_pdf(_odts_lote(clave), destino)
+
+
+def _escribir_lote_zip(clave, destino):
+    from .pdf import escribir_lote_zip
+    escribir_lote_zip(_odts_lote(clave), destino)
+
+
+# tipo -> (escritor, nombre de archivo, content type, permiso para descargar)
+GENERADORES = {
+    Tipo.REPORTE_PDF: (_escribir_reporte_pdf, 'reporte_odt.pdf', 'application/pdf',
+                       'controlodt.estadisticas'),
+    Tipo.REPORTE_EXCEL: (_escribir_reporte_excel, 'reporte_odt.xlsx',
+                         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                         'controlodt.estadisticas'),
+    Tipo.DETALLE_PDF: (_escribir_detalle_pdf, 'detalle_odt.pdf', 'application/pdf', None),
+    Tipo.LOTE_PDF: (_escribir_lote_pdf, 'detalles_odt.pdf', 'application/pdf', 'controlodt.estadisticas'),
+    Tipo.LOTE_ZIP: (_escribir_lote_zip, 'detalles_odt.zip', 'application/zip', 'controlodt.estadisticas'),
+}
+
+
+def puede_descargar(usuario, trabajo):
+    permiso = GENERADORES[trabajo.tipo][3]
+    return permiso is None or usuario.has_perm(permiso)
+
+
+# =========================
+#          WORKER
+# =========================
+class TiempoExcedido(Exception):
+    pass
+
+
+@contextmanager
+def _limite_tiempo(segundos):
+    """
+    Lanza TiempoExcedido dentro del bloque si tarda más de `segundos`
+    (SIGALRM: solo en Unix y en el hilo principal; si no, sin límite).
+    """
+    if not hasattr(signal, 'setitimer') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _alarma(signum, frame):
+        raise TiempoExcedido(f'Se superó el tiempo máximo de {segundos:g} s.')
+
+    anterior = signal.signal(signal.SIGALRM, _alarma)
+    signal.setitimer(signal.ITIMER_REAL, segundos)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, anterior)
+
+
+def procesar(trabajo):
+    """Genera el archivo de un trabajo ya reclamado (EN_PROCESO) y lo marca LISTO/ERROR."""
+    escritor, nombre, _, _ = GENERADORES[trabajo.tipo]
+    cambios = {'estado': TrabajoReporte.Estado.LISTO, 'error': ''}
+    try:
+        with tempfile.TemporaryFile() as archivo:
+            with _limite_tiempo(tiempo_maximo().total_seconds()):
+                escritor(trabajo.clave, archivo)
+            # Fuera del límite: la alarma no puede cortar el guardado y dejar un archivo huérfano
+            archivo.seek(0)
+            trabajo.archivo.save(nombre, File(archivo), save=False)
+        cambios['archivo'] = trabajo.archivo.name
+    except Exception as e:
+        logger.exception('Falló el trabajo de reporte %s', trabajo.pk)
+        cambios = {'estado': TrabajoReporte.Estado.ERROR, 'error': str(e)}
+
+    ahora = timezone.now()
+    actualizados = TrabajoReporte.objects.filter(pk=trabajo.pk, estado=TrabajoReporte.Estado.EN_PROCESO).update(
+        terminado_en=ahora, expira_en=ahora + ttl(), **cambios)
+    if not actualizados and 'archivo' in cambios:
+        # Se consideró colgado y otro worker lo retomó: descartar este archivo
+        trabajo.archivo.delete(save=False)
+    return cambios['estado']
+
+
+def procesar_pendientes(limite=None):
+    """Reencola colgados, purga vencidos y procesa pendientes. Devuelve cuántos procesó."""
+    TrabajoReporte.objects.reencolar_colgados(tiempo_maximo())
+    TrabajoReporte.objects.purgar()
+    procesados = 0
+    while limite is None or procesados < limite:
+        trabajo = TrabajoReporte.objects.reclamar()
+        if trabajo is None:
+            break
+        procesar(trabajo)
+        procesados += 1
+    return procesados
+
+
+# =========================
+#         MÉTRICAS
+# =========================
+def _percentiles(valores):
+    if not valores:
+        return {'p50': None, 'p95': None, 'max': None}
+    valores = sorted(valores)
+    return {
+        'p50': round(statistics.median(valores), 3),
+        'p95': round(valores[min(len(valores) - 1, int(len(valores) * 0.95))], 3),
+        'max': round(valores[-1], 3),
+    }
+
+
+def metricas(ventana=timedelta(hours=1)):
+    """
+    Estado de la cola y, por tipo, espera en cola (creado -> iniciado) y
+    tiempo de render (iniciado -> terminado) de los trabajos terminados
+    en la `ventana`, en segundos.
+    """
+    Estado = TrabajoReporte.Estado
+    activos = dict(TrabajoReporte.objects.filter(estado__in=TrabajoReporte.ACTIVOS)
+                   .values_list('estado').annotate(total=Count('pk')).order_by())
+    terminados = (TrabajoReporte.objects
+                  .filter(terminado_en__gte=timezone.now() - ventana, iniciado_en__isnull=False)
+                  .values_list('tipo', 'estado', 'creado_en', 'iniciado_en', 'terminado_en'))
+    por_tipo = {}
+    for tipo, estado, creado, iniciado, terminado in terminados:
+        datos = por_tipo.setdefault(tipo, {'listos': 0, 'errores': 0, 'espera': [], 'render': []})
+        datos['listos' if estado == Estado.LISTO else 'errores'] += 1
+        datos['espera'].append((iniciado - creado).total_seconds())
+        datos['render'].append((terminado - iniciado).total_seconds())
+
+    return {
+        'pendientes': activos.get(Estado.PENDIENTE, 0),
+        'en_proceso': activos.get(Estado.EN_PROCESO, 0),
+        'cola_maxima': getattr(settings, 'REPORTES_COLA_MAXIMA', 50),
+        'tiempo_maximo': tiempo_maximo().total_seconds(),
+        'ventana': ventana.total_seconds(),
+        'tipos': {
+            tipo: {
+                'listos': datos['listos'],
+                'errores': datos['errores'],
+                'espera': _percentiles(datos['espera']),
+                'render': _percentiles(datos['render']),
+            }
+            for tipo, datos in por_tipo.items()
+        },
+    }
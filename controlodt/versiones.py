@@ -0,0 +1,33 @@
+"""
+Versiones en la caché de Django para invalidar grupos de entradas.
+
+Las claves de los datos incluyen la versión (`f'{nombre}:{version}'`);
+subirla deja huérfanas las entradas viejas en todos los workers a la vez,
+sin borrar nada (expiran por su TTL). Lo usan permisos.py y listas.py.
+La versión inicial sale del reloj: si la caché expulsa la clave de versión,
+la nueva no coincide con la de entradas viejas que sigan guardadas.
+"""
+import time
+
+
+def _inicial():
+    return time.time_ns() // 1000
+
+
+def version(cache, nombre):
+    clave = f'version:{nombre}'
+    valor = cache.get(clave)
+    if valor is None:
+        cache.add(clave, _inicial(), None)
+        valor = cache.get(clave) or _inicial()
+    return valor
+
+
+def subir_version(cache, nombre):
+    clave = f'version:{nombre}'
+    if not cache.add(clave, _inicial(), None):
+        try:
+            cache.incr(clave)
+        except ValueError:
+            # Expulsada entre add e incr
+            cache.set(clave, _inicial(), None)
@@ -0,0 +1,20 @@
+"""
+Vistas de controlodt, agrupadas por área. Este paquete reexporta todas
+las vistas para que `core/urls.py` siga usando `views.<nombre>`.
+"""
+from .auth import dashboard, home, login_view, logout_view
+from .grupos import group_create, group_edit, group_list
+from .mantenimiento import (
+    maquinaria_create, maquinaria_edit, maquinaria_list, maquinaria_toggle,
+    tipo_create, tipo_edit, tipo_list, tipo_toggle,
+)
+from .odt import (
+    ACCIONES_MASIVAS, odt_accion_masiva, odt_aprobar_final, odt_asignar_responsable, odt_create,
+    odt_detail, odt_editar_general, odt_ejecutar, odt_enviar_solicitud, odt_finalizar_ejecucion,
+    odt_iniciar_ejecucion, odt_list, odt_revisar, puede_editar_odt,
+)
+from .reportes import (
+    exportar_odt_csv, exportar_odt_ndjson, odt_detalle_pdf, odt_detalles_lote, reporte_odt_excel, reporte_odt_pdf,
+    reporte_odt_view, trabajo_reporte_descarga, trabajo_reporte_estado, trabajo_reporte_metricas,
+)
+from .usuarios import listar_user, mi_perfil, toggle_active_user, user_create, user_edit
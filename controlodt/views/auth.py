@@ -0,0 +1,52 @@
+from django.contrib import messages
+from django.contrib.auth import login, logout
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect, render
+from django.urls import reverse
+
+from ..forms import LoginEmailForm
+
+
+def home(request):
+ 
+    if request.user.is_authenticated:
+        return redirect("dashboard")
+
+    show_login_modal = request.GET.get("login") == "1"
+    context = {
+        "form": LoginEmailForm(),
+        "show_login_modal": show_login_modal,
+    }
+    return render(request, "home.html", context)
+
+
+def login_view(request):
+    if request.method == "POST":
+        form = LoginEmailForm(request=request, data=request.POST)
+        if form.is_valid():
+            user = form.get_user()
+            login(request, user)
+            # Remember me
+            if form.cleaned_data.get("remember_me"):
+                request.session.set_expiry(60 * 60 * 24 * 14)  
+            else:
+                request.session.set_expiry(0)  
+
+            next_url = request.POST.get("next") or reverse("dashboard")
+            return redirect(next_url)
+        else:
+         
+            messages.error(request, "Revisa tus credenciales.")
+            return render(request, "home.html", {"form": form, "show_login_modal": True})
+
+    
+    return redirect(f'{reverse("home")}?login=1')
+
+def logout_view(request):
+    logout(request)
+    messages.success(request, "Sesión cerrada.")
+    return redirect("home")
+
+@login_required
+def dashboard(request):
+    return render(request, "dashboard.html")
@@ -0,0 +1,88 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, permission_required
+from django.contrib.auth.models import Group
+from django.db.models import Q
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+
+from ..forms import GroupForm
+from ..paginacion import paginador
+
+
+@login_required
+@permission_required('auth.view_group', raise_exception=True)
+def group_list(request):
+    q = (request.GET.get("q") or "").strip()
+    per_page_options = [8, 20, 30, 50, 100]
+
+   
+    try:
+        per_page = int(request.GET.get("per_page") or 10)
+    except ValueError:
+        per_page = 10
+    if per_page not in per_page_options:
+        per_page = 10
+
+    groups = Group.objects.all().order_by("name")
+    if q:
+        groups = groups.filter(Q(name__icontains=q))
+
+
+    paginator = paginador('group_list', groups, per_page, request.GET)
+    page_obj = paginator.get_page(request.GET.get("page"))
+
+    context = {
+        "page_obj": page_obj,        
+        "groups": page_obj,           
+        "q": q,
+        "per_page": per_page,
+        "per_page_options": per_page_options,
+        "total": paginator.count,    
+        "current_querystring": request.META.get("QUERY_STRING", ""),
+    }
+
+    return render(request, "groups/group_list.html", context)
+
+@login_required
+@permission_required('auth.add_group', raise_exception=True)
+def group_create(request):
+    next_url = request.GET.get("next") or reverse("group_list")
+    if request.method == "POST":
+        form = GroupForm(request.POST)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Grupo creado correctamente.")
+            return redirect(next_url)
+    else:
+        form = GroupForm()
+
+    return render(request, "groups/group_form.html", {
+        "title": "Crear grupo",
+        "form": form,
+        "is_edit": False,
+        "next_url": next_url,
+    })
+
+
+@login_required
+@permission_required('auth.change_group', raise_exception=True)
+def group_edit(request, pk):
+    group = get_object_or_404(Group, pk=pk)
+    next_url = request.GET.get("next") or reverse("group_list")
+
+    if request.method == "POST":
+        form = GroupForm(request.POST, instance=group)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Grupo actualizado correctamente.")
+            return redirect(next_url)
+    else:
+        form = GroupForm(instance=group)
+
+    return render(request, "groups/group_form.html", {
+        "title": "Editar grupo",
+        "form": form,
+        "is_edit": True,
+        "group_obj": group,
+        "next_url": next_url,
+    })
@@ -0,0 +1,124 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, permission_required
+from django.shortcuts import get_object_or_404, redirect, render
+
+from ..forms import MaquinariaForm, TipoMaquinariaForm
+from ..models import Maquinaria, TipoMaquinaria
+
+
+# =======================
+#   TIPO MAQUINARIA
+# =======================
+@login_required
+@permission_required('controlodt.view_tipomaquinaria', raise_exception=True)
+def tipo_list(request):
+    tipos = TipoMaquinaria.objects.all()
+    return render(request, "mantenimiento/tipo_list.html", {
+        "tipos": tipos,
+        "title": "Líneas de Trabajo"
+    })
+
+@login_required
+@permission_required('controlodt.add_tipomaquinaria', raise_exception=True)
+def tipo_create(request):
+    if request.method == "POST":
+        form = TipoMaquinariaForm(request.POST)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Registro creado correctamente")
+            return redirect("tipo_list")
+    else:
+        form = TipoMaquinariaForm()
+
+    return render(request, "mantenimiento/tipo_form.html", {
+        "form": form,
+        "title": "Nueva Línea de Trabajo"
+    })
+
+@login_required
+@permission_required('controlodt.change_tipomaquinaria', raise_exception=True)
+def tipo_edit(request, pk):
+    obj = get_object_or_404(TipoMaquinaria, pk=pk)
+
+    if request.method == "POST":
+        form = TipoMaquinariaForm(request.POST, instance=obj)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Registro actualizado correctamente")
+            return redirect("tipo_list")
+    else:
+        form = TipoMaquinariaForm(instance=obj)
+
+    return render(request, "mantenimiento/tipo_form.html", {
+        "form": form,
+        "title": "Editar Línea de Trabajo",
+        "is_edit": True
+    })
+
+@login_required
+@permission_required('controlodt.delete_tipomaquinaria', raise_exception=True)
+def tipo_toggle(request, pk):
+    obj = get_object_or_404(TipoMaquinaria, pk=pk)
+    obj.activo = not obj.activo
+    obj.save()
+    return redirect("tipo_list")
+
+
+# =======================
+#       MAQUINARIA
+# =======================
+@login_required
+@permission_required('controlodt.view_maquinaria', raise_exception=True)
+def maquinaria_list(request):
+    maquinas = Maquinaria.objects.select_related().all()
+    return render(request, "mantenimiento/maquinaria_list.html", {
+        "maquinas": maquinas,
+        "title": "Equipos de Trabajo"
+    })
+
+@login_required
+@permission_required('controlodt.add_maquinaria', raise_exception=True)
+def maquinaria_create(request):
+    if request.method == "POST":
+        form = MaquinariaForm(request.POST)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Equipo registrado correctamente")
+            return redirect("maquinaria_list")
+    else:
+        form = MaquinariaForm()
+
+    return render(request, "mantenimiento/maquinaria_form.html", {
+        "form": form,
+        "title": "Registrar Equipo"
+    })
+
+
+@login_required
+@permission_required('controlodt.change_maquinaria', raise_exception=True)
+def maquinaria_edit(request, pk):
+    obj = get_object_or_404(Maquinaria, pk=pk)
+
+    if request.method == "POST":
+        form = MaquinariaForm(request.POST, instance=obj)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Equipo actualizado correctamente")
+            return redirect("maquinaria_list")
+    else:
+        form = MaquinariaForm(instance=obj)
+
+    return render(request, "mantenimiento/maquinaria_form.html", {
+        "form": form,
+        "title": "Editar Equipo",
+        "is_edit": True
+    })
+
+
+@login_required
+@permission_required('controlodt.delete_maquinaria', raise_exception=True)
+def maquinaria_toggle(request, pk):
+    obj = get_object_or_404(Maquinaria, pk=pk)
+    obj.activo = not obj.activo
+    obj.save()
+    return redirect("maquinaria_list")
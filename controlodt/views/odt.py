@@ -0,0 +1,593 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, permission_required
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+
+from .. import listas
+from ..forms import (
+    ODTCreateForm, ODTAsignarResponsableForm, DetalleEjecucionForm,
+    RepuestoFormSet, PersonalFormSet, ODTRevisionForm, ODTAprobacionForm,
+    ODTEditGeneralForm,  # Nuevo formulario
+    ODTAccionMasivaForm,
+)
+from ..models import DetalleEjecucion, RegistroODT
+from ..paginacion import CursorInvalido, paginador, paginar_por_cursor
+
+
+# =========================
+# HELPER: Verificar permisos de edición
+# =========================
+
+def puede_editar_odt(user, odt):
+    """
+    Determina si un usuario puede editar una ODT.
+    Pueden editar:
+    - El que autorizó la ODT
+    - El que revisó la ODT
+    - Usuarios con permiso 'odt.editar_completo'
+    - Superusuarios
+    """
+    if user.is_superuser:
+        return True
+    
+    # Verificar si tiene el permiso específico
+    if user.has_perm('app.editar_completo_odt'):  # Ajusta 'app' al nombre de tu app
+        return True
+    
+    # Verificar si es el autorizado o el revisor
+    if odt.autorizado_por == user or odt.revisado_por == user:
+        return True
+    
+    return False
+
+
+# =========================
+# VISTA: Listado de ODTs
+# =========================
+def _url_lista(filtros, **pagina):
+    """Querystring de otra página del listado conservando los filtros."""
+    params = filtros.copy()
+    for clave, valor in pagina.items():
+        params[clave] = valor
+    return f'?{params.urlencode()}'
+
+
+@login_required
+@permission_required('controlodt.view_registroodt', raise_exception=True)
+def odt_list(request):
+    user = request.user
+
+    # ================= FILTROS =================
+    tipo = request.GET.get('tipo')
+    maquinaria = request.GET.get('maquinaria')
+   
+    prioridad = request.GET.get('prioridad')
+
+    # ===== Base queryset según permisos (UNION por rol, ver visibles_para) =====
+    odts = RegistroODT.objects.visibles_para(user)
+
+    # ===== Aplicar filtros =====
+    if tipo:
+        odts = odts.filter(tipo_id=tipo)
+
+    if maquinaria:
+        odts = odts.filter(maquinaria_id=maquinaria)
+
+  
+
+    if prioridad:
+        odts = odts.filter(prioridad=prioridad)
+
+    odts = odts.select_related('tipo', 'maquinaria', 'creado_por', 'responsable_ejecucion')
+
+    # ===== PAGINACIÓN =====
+    # Por cursor (creado_en, id): cada página cuesta lo mismo que la primera.
+    # ?page=N (enlaces antiguos) sigue usando Paginator con OFFSET.
+    filtros = request.GET.copy()
+    for param in ('page', 'cursor'):
+        filtros.pop(param, None)
+    if 'page' in request.GET:
+        paginator = paginador('odt_list', odts.order_by('-creado_en', '-id'), 10, request.GET, user.pk)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        url_anterior = url_siguiente = None
+        if page_obj.has_previous():
+            url_anterior = _url_lista(filtros, page=page_obj.previous_page_number())
+        if page_obj.has_next():
+            url_siguiente = _url_lista(filtros, page=page_obj.next_page_number())
+    else:
+        try:
+            page_obj = paginar_por_cursor(odts, request.GET.get('cursor'), 10)
+        except CursorInvalido:
+            page_obj = paginar_por_cursor(odts, None, 10)
+        url_anterior = _url_lista(filtros, cursor=page_obj.cursor_anterior) if page_obj.has_previous else None
+        url_siguiente = _url_lista(filtros, cursor=page_obj.cursor_siguiente) if page_obj.has_next else None
+
+    context = {
+        'title': 'Órdenes de Trabajo',
+        'page_obj': page_obj,
+        'odts': page_obj.object_list,
+        'url_anterior': url_anterior,
+        'url_siguiente': url_siguiente,
+        'form_masivo': ODTAccionMasivaForm(),
+        'puede_accion_masiva': any(user.has_perm(p) for p in set(ACCIONES_MASIVAS.values())),
+
+        # Enviamos data para combos
+        'tipos': listas.opciones('tipos'),
+        'maquinarias': listas.opciones('maquinarias'),
+        'estados': RegistroODT.EstadoODT.choices,
+        'prioridades': RegistroODT.prioridad_choices,
+    }
+
+    return render(request, 'odt/odt_list.html', context)
+
+
+# =========================
+# VISTA: Crear ODT
+# =========================
+
+@login_required
+@permission_required('controlodt.view_registroodt', raise_exception=True)
+def odt_create(request):
+    """
+    Permite a un usuario crear una nueva ODT.
+    Estado inicial: BORRADOR
+    """
+    if request.method == 'POST':
+        form = ODTCreateForm(request.POST)
+        if form.is_valid():
+            odt = form.save(commit=False)
+            odt.creado_por = request.user
+            odt.estado = RegistroODT.EstadoODT.BORRADOR
+            odt.save()
+            messages.success(request, f'ODT #{odt.pk} creada exitosamente.')
+            return redirect('odt_detail', pk=odt.pk)
+    else:
+        form = ODTCreateForm()
+    
+    context = {
+        'title': 'Nueva Orden de Trabajo',
+        'form': form
+    }
+    return render(request, 'odt/odt_form.html', context)
+
+
+# =========================
+# VISTA: Detalle ODT
+# =========================
+@login_required
+@permission_required('controlodt.detalle_odt', raise_exception=True)
+def odt_detail(request, pk):
+    """
+    Muestra el detalle completo de una ODT (consultas fijas, ver con_detalle).
+    """
+    odt = get_object_or_404(RegistroODT.objects.con_detalle(), pk=pk)
+    
+    # Verificar si puede editar
+    puede_editar = puede_editar_odt(request.user, odt)
+    
+    context = {
+        'title': f'ODT #{odt.pk}',
+        'odt': odt,
+        'puede_editar': puede_editar
+    }
+    return render(request, 'odt/odt_detail.html', context)
+
+
+# =========================
+# VISTA: Edición General ODT (Solo supervisores)
+# =========================
+@login_required
+@transaction.atomic
+@permission_required('controlodt.editar_completo_odt', raise_exception=True)
+def odt_editar_general(request, pk):
+    """
+    Permite editar todos los campos de la ODT.
+    Solo para usuarios autorizados, revisores o con permisos especiales.
+    """
+    odt = get_object_or_404(RegistroODT, pk=pk)
+    
+    
+    
+    # Obtener o crear DetalleEjecucion si existe
+    detalle = None
+    if hasattr(odt, 'detalle_ejecucion'):
+        detalle = odt.detalle_ejecucion
+    
+    if request.method == 'POST':
+        form_odt = ODTEditGeneralForm(request.POST, instance=odt)
+        form_detalle = DetalleEjecucionForm(request.POST, instance=detalle) if detalle else None
+        formset_repuestos = RepuestoFormSet(request.POST, instance=odt)
+        formset_personal = PersonalFormSet(request.POST, instance=odt)
+        
+        if form_odt.is_valid() and formset_repuestos.is_valid() and formset_personal.is_valid():
+            # Guardar ODT
+            odt = form_odt.save()
+            
+            # Guardar detalle si existe
+            if form_detalle and form_detalle.is_valid():
+                form_detalle.save()
+            
+            # Guardar formsets
+            formset_repuestos.save()
+            formset_personal.save()
+            
+            messages.success(request, f'ODT #{odt.pk} actualizada exitosamente.')
+            return redirect('odt_detail', pk=pk)
+    else:
+        form_odt = ODTEditGeneralForm(instance=odt)
+        form_detalle = DetalleEjecucionForm(instance=detalle) if detalle else None
+        formset_repuestos = RepuestoFormSet(instance=odt)
+        formset_personal = PersonalFormSet(instance=odt)
+    
+    context = {
+        'title': f'Editar ODT #{odt.pk}',
+        'odt': odt,
+        'puede_editar': puede_editar_odt(request.user, odt),
+        'form_odt': form_odt,
+        'form_detalle': form_detalle,
+        'formset_repuestos': formset_repuestos,
+        'formset_personal': formset_personal
+    }
+    return render(request, 'odt/odt_editar_general.html', context)
+
+
+# =========================
+# VISTA: Enviar a Solicitud
+# =========================
+@login_required
+@permission_required('controlodt.enviar_solicitud', raise_exception=True)
+def odt_enviar_solicitud(request, pk):
+    """
+    El creador envía la ODT para solicitud (para que sea autorizada).
+    """
+    if RegistroODT.objects.filter(pk=pk, creado_por=request.user).transicionar('enviar_solicitud'):
+        messages.success(request, f'ODT #{pk} enviada a solicitud.')
+        return redirect('odt_detail', pk=pk)
+
+    # No se aplicó: averiguar el motivo solo en el camino de error
+    odt = get_object_or_404(RegistroODT.objects.only('estado', 'creado_por'), pk=pk)
+    if odt.creado_por_id != request.user.pk:
+        messages.error(request, 'No tienes permiso para realizar esta acción.')
+    else:
+        messages.warning(request, 'Esta ODT ya no está en borrador.')
+    return redirect('odt_detail', pk=pk)
+
+
+# =========================
+# VISTA: Asignar Responsable (Usuario Autorizado)
+# =========================
+@login_required
+@permission_required('controlodt.autorizar_odt', raise_exception=True)
+def odt_asignar_responsable(request, pk):
+    """
+    El usuario "autorizado" asigna el responsable de ejecución y aprueba la ODT.
+    Cambia estado a ASIGNADA.
+    """
+    odt = get_object_or_404(RegistroODT, pk=pk)
+    
+    # Solo si está en SOLICITUD
+    if not odt.puede_transicionar('asignar'):
+        messages.warning(request, 'Esta ODT no está en estado de solicitud.')
+        return redirect('odt_detail', pk=pk)
+    
+    if request.method == 'POST':
+        form = ODTAsignarResponsableForm(request.POST, instance=odt)
+        if form.is_valid():
+            asignada = odt.transicionar(
+                'asignar',
+                autorizado_por=request.user,
+                **{campo: form.cleaned_data[campo] for campo in form.Meta.fields},
+            )
+            if not asignada:
+                messages.warning(request, 'Esta ODT cambió de estado mientras se asignaba. No se aplicaron cambios.')
+                return redirect('odt_detail', pk=pk)
+            messages.success(request, f'Responsable asignado a ODT #{odt.pk}.')
+            return redirect('odt_detail', pk=pk)
+    else:
+        form = ODTAsignarResponsableForm(instance=odt)
+    
+    context = {
+        'title': f'Asignar Responsable - ODT #{odt.pk}',
+        'form': form,
+        'odt': odt
+    }
+    return render(request, 'odt/odt_asignar.html', context)
+
+
+# =========================
+# VISTA: Iniciar Ejecución
+# =========================
+@login_required
+@permission_required('controlodt.mantenimiento_odt', raise_exception=True)
+def odt_iniciar_ejecucion(request, pk):
+    """
+    El responsable de ejecución inicia la ODT.
+    Cambia estado a EN_EJECUCION.
+    """
+    iniciada = RegistroODT.objects.filter(pk=pk, responsable_ejecucion=request.user).transicionar(
+        'iniciar', fecha_inicio=timezone.now()
+    )
+    if iniciada:
+        messages.success(request, f'ODT #{pk} en ejecución.')
+        return redirect('odt_ejecutar', pk=pk)
+
+    odt = get_object_or_404(RegistroODT.objects.only('estado', 'responsable_ejecucion'), pk=pk)
+    if odt.responsable_ejecucion_id != request.user.pk:
+        messages.error(request, 'No eres el responsable de esta ODT.')
+    else:
+        messages.warning(request, 'Esta ODT no está asignada.')
+    return redirect('odt_detail', pk=pk)
+
+
+# =========================
+# VISTA: Ejecutar ODT (Completar Detalles)
+# =========================
+@login_required
+@transaction.atomic
+@permission_required('controlodt.mantenimiento_odt', raise_exception=True)
+def odt_ejecutar(request, pk):
+    """
+    El responsable completa los detalles de ejecución, repuestos y personal.
+    """
+    odt = get_object_or_404(RegistroODT, pk=pk)
+    
+    if odt.responsable_ejecucion != request.user:
+        messages.error(request, 'No eres el responsable de esta ODT.')
+        return redirect('odt_detail', pk=pk)
+    
+    if odt.estado not in [RegistroODT.EstadoODT.EN_EJECUCION, RegistroODT.EstadoODT.RECHAZADA]:
+        messages.warning(request, 'Esta ODT no está en ejecución.')
+        return redirect('odt_detail', pk=pk)
+    
+    # Obtener o crear DetalleEjecucion
+    detalle, created = DetalleEjecucion.objects.get_or_create(registro=odt)
+    
+    if request.method == 'POST':
+        form_detalle = DetalleEjecucionForm(request.POST, instance=detalle)
+        formset_repuestos = RepuestoFormSet(request.POST, instance=odt)
+        formset_personal = PersonalFormSet(request.POST, instance=odt)
+        
+        if form_detalle.is_valid() and formset_repuestos.is_valid() and formset_personal.is_valid():
+            # Guardar detalle
+            detalle = form_detalle.save(commit=False)
+            detalle.ejecutado_por = request.user
+            detalle.save()
+            
+            # Guardar formsets
+            formset_repuestos.save()
+            formset_personal.save()
+
+            # Los hijos no tocan la ODT: marcarla como modificada para las
+            # exportaciones incrementales (?since=)
+            RegistroODT.objects.filter(pk=odt.pk).update(actualizado_en=timezone.now())
+            
+            messages.success(request, 'Detalles de ejecución guardados.')
+            return redirect('odt_detail', pk=pk)
+    else:
+        form_detalle = DetalleEjecucionForm(instance=detalle)
+        formset_repuestos = RepuestoFormSet(instance=odt)
+        formset_personal = PersonalFormSet(instance=odt)
+    
+    context = {
+        'title': f'Ejecutar ODT #{odt.pk}',
+        'odt': odt,
+        'form_detalle': form_detalle,
+        'formset_repuestos': formset_repuestos,
+        'formset_personal': formset_personal
+    }
+    return render(request, 'odt/odt_ejecutar.html', context)
+
+
+# =========================
+# VISTA: Finalizar Ejecución (Enviar a Revisión)
+# =========================
+@login_required
+@permission_required('controlodt.autorizar_odt', raise_exception=True)
+def odt_finalizar_ejecucion(request, pk):
+    """
+    El responsable finaliza la ejecución y envía a revisión.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        finalizada = RegistroODT.objects.filter(
+            pk=pk,
+            responsable_ejecucion=request.user,
+            detalle_ejecucion__isnull=False,
+        ).transicionar('finalizar', fecha_termino=ahora)
+
+        if finalizada:
+            # Actualizar fecha de firma en detalle
+            DetalleEjecucion.objects.filter(registro_id=pk).update(firmado_fecha=ahora)
+
+    if finalizada:
+        messages.success(request, f'ODT #{pk} enviada a revisión.')
+        return redirect('odt_detail', pk=pk)
+
+    odt = get_object_or_404(RegistroODT.objects.only('estado', 'responsable_ejecucion'), pk=pk)
+    if odt.responsable_ejecucion_id != request.user.pk:
+        messages.error(request, 'No eres el responsable de esta ODT.')
+        return redirect('odt_detail', pk=pk)
+
+    if not odt.puede_transicionar('finalizar'):
+        messages.warning(request, 'Esta ODT no está en ejecución.')
+        return redirect('odt_detail', pk=pk)
+
+    # Verificar que exista detalle de ejecución
+    messages.error(request, 'Debe completar los detalles de ejecución antes de finalizar.')
+    return redirect('odt_ejecutar', pk=pk)
+
+
+# =========================
+# VISTA: Revisar ODT
+# =========================
+@login_required
+@permission_required('controlodt.revisar_odt', raise_exception=True)
+def odt_revisar(request, pk):
+    """
+    El revisor aprueba o rechaza la ODT en revisión.
+    """
+    odt = get_object_or_404(RegistroODT, pk=pk)
+    
+    if not odt.puede_transicionar('aprobar_revision'):
+        messages.warning(request, 'Esta ODT no está en revisión.')
+        return redirect('odt_detail', pk=pk)
+    
+    if request.method == 'POST':
+        form = ODTRevisionForm(request.POST)
+        if form.is_valid():
+            decision = form.cleaned_data['decision']
+            
+            if decision == 'aprobar':
+                if odt.transicionar('aprobar_revision', revisado_por=request.user):
+                    messages.success(request, f'ODT #{odt.pk} aprobada en revisión.')
+                else:
+                    messages.warning(request, 'Esta ODT ya no está en revisión. No se aplicaron cambios.')
+            else:
+                if odt.transicionar('rechazar_revision'):
+                    messages.warning(request, f'ODT #{odt.pk} rechazada. Devuelta a ejecución.')
+                else:
+                    messages.warning(request, 'Esta ODT ya no está en revisión. No se aplicaron cambios.')
+            
+            return redirect('odt_detail', pk=pk)
+    else:
+        form = ODTRevisionForm()
+    
+    context = {
+        'title': f'Revisar ODT #{odt.pk}',
+        'odt': odt,
+        'form': form
+    }
+    return render(request, 'odt/odt_revisar.html', context)
+
+
+# =========================
+# VISTA: Aprobación Final
+# =========================
+@login_required
+@permission_required('controlodt.aprobar_odt', raise_exception=True)
+def odt_aprobar_final(request, pk):
+    """
+    Aprobación final de la ODT (puede ser el mismo autorizado u otro usuario).
+    """
+    odt = get_object_or_404(RegistroODT, pk=pk)
+    
+    if not odt.puede_transicionar('cerrar'):
+        messages.warning(request, 'Esta ODT no está lista para aprobación final.')
+        return redirect('odt_detail', pk=pk)
+    
+    if request.method == 'POST':
+        form = ODTAprobacionForm(request.POST)
+        if form.is_valid():
+            decision = form.cleaned_data['decision']
+            
+            if decision == 'aprobar':
+                if odt.transicionar('cerrar', aprobado_por=request.user):
+                    messages.success(request, f'ODT #{odt.pk} cerrada exitosamente.')
+                else:
+                    messages.warning(request, 'Esta ODT ya no está pendiente de aprobación. No se aplicaron cambios.')
+            else:
+                if odt.transicionar('rechazar_aprobacion'):
+                    messages.warning(request, f'ODT #{odt.pk} rechazada en aprobación.')
+                else:
+                    messages.warning(request, 'Esta ODT ya no está pendiente de aprobación. No se aplicaron cambios.')
+            
+            return redirect('odt_detail', pk=pk)
+    else:
+        form = ODTAprobacionForm()
+    
+    context = {
+        'title': f'Aprobación Final - ODT #{odt.pk}',
+        'odt': odt,
+        'form': form
+    }
+    return render(request, 'odt/odt_aprobar.html', context)
+
+
+# =========================
+# VISTA: Acciones masivas desde el listado
+# =========================
+# accion -> permiso requerido (la accion es también el nombre de la transición)
+ACCIONES_MASIVAS = {
+    'asignar': 'controlodt.autorizar_odt',
+    'enviar_solicitud': 'controlodt.enviar_solicitud',
+    'cerrar': 'controlodt.aprobar_odt',
+    'rechazar_aprobacion': 'controlodt.aprobar_odt',
+}
+
+
+@login_required
+@require_POST
+@permission_required('controlodt.view_registroodt', raise_exception=True)
+def odt_accion_masiva(request):
+    """
+    Aplica una acción del flujo a muchas ODTs en una sola petición.
+    - Aplica el cambio con un único UPDATE condicionado a estado y permisos,
+      que devuelve los ids actualizados (RegistroODTQuerySet.transicionar).
+    - Devuelve un resultado por id (JSON si se pide, si no mensajes + redirect).
+    """
+    form = ODTAccionMasivaForm(request.POST)
+    quiere_json = 'application/json' in request.headers.get('Accept', '')
+
+    if not form.is_valid():
+        if quiere_json:
+            return JsonResponse({'errores': form.errors}, status=400)
+        for errores in form.errors.values():
+            for error in errores:
+                messages.error(request, error)
+        return redirect(_volver_a_listado(request))
+
+    accion = form.cleaned_data['accion']
+    ids = form.cleaned_data['ids']
+    if not request.user.has_perm(ACCIONES_MASIVAS[accion]):
+        raise PermissionDenied
+
+    origen = RegistroODT.TRANSICIONES[accion].origen
+    cambios = {}
+    if accion == 'asignar':
+        cambios = {
+            'autorizado_por': request.user,
+            'responsable_ejecucion': form.cleaned_data['responsable_ejecucion'],
+        }
+    elif accion == 'cerrar':
+        cambios = {'aprobado_por': request.user}
+
+    # Un solo UPDATE ... RETURNING decide qué ODTs cambian; las que no, se
+    # leen después (sin bloqueo) solo para explicar el motivo
+    condiciones = {'creado_por': request.user} if accion == 'enviar_solicitud' else None
+    resultado = RegistroODT.objects.filter(pk__in=ids).transicionar(accion, condiciones, **cambios)
+    aplicar = resultado.aplicadas
+
+    estados = dict(RegistroODT.EstadoODT.choices)
+    resultados = {pk: 'No existe' for pk in ids}
+    resultados.update((pk, 'Aplicada') for pk in aplicar)
+    if len(aplicar) < len(ids):
+        for pk, estado in resultado.rechazadas.items():
+            if estado in origen:
+                resultados[pk] = 'Sin permiso sobre esta ODT'
+            else:
+                resultados[pk] = f'Estado actual: {estados.get(estado, estado)}'
+
+    if quiere_json:
+        return JsonResponse({
+            'accion': accion,
+            'aplicadas': len(aplicar),
+            'resultados': {str(pk): motivo for pk, motivo in resultados.items()},
+        })
+
+    if aplicar:
+        messages.success(request, f'{len(aplicar)} ODT(s) procesadas: {dict(ODTAccionMasivaForm.ACCION_CHOICES)[accion]}.')
+    for pk, motivo in resultados.items():
+        if pk not in aplicar:
+            messages.warning(request, f'ODT id {pk}: {motivo}.')
+    return redirect(_volver_a_listado(request))
+
+
+def _volver_a_listado(request):
+    base = reverse('odt_list')
+    next_url = request.POST.get('next', '')
+    return f'{base}{next_url}' if next_url.startswith('?') else base
@@ -0,0 +1,249 @@
+"""
+Reportes y exportaciones. Las vistas solo encolan o transmiten: xhtml2pdf,
+matplotlib y openpyxl se importan recién en el worker que genera el archivo
+(ver trabajos.py, pdf.py y exportacion.py).
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, permission_required
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .. import listas, trabajos
+from ..cache_pdf import cache_detalle, huella_detalle
+from ..exportacion import TABLAS_CSV, filas_csv, filas_ndjson, respuesta_streaming
+from ..models import ColaLlena, RegistroODT, TrabajoReporte
+from ..paginacion import paginador
+from ..reportes import FiltrosReporte, estadisticas_reporte
+
+logger = logging.getLogger(__name__)
+
+
+def _responder_trabajo(request, trabajo):
+    """
+    Respuesta de un endpoint de exportación: JSON con las URLs de estado y
+    descarga, o redirección (a la descarga si ya está listo).
+    """
+    estado_url = reverse('trabajo_reporte_estado', args=[trabajo.pk])
+    descarga_url = reverse('trabajo_reporte_descarga', args=[trabajo.pk])
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({
+            'id': trabajo.pk,
+            'estado': trabajo.estado,
+            'estado_url': estado_url,
+            'descarga_url': descarga_url,
+        }, status=200 if trabajo.listo else 202)
+    return redirect(descarga_url if trabajo.listo else estado_url)
+
+
+def _encolar(request, tipo, clave):
+    """
+    Encola (o reutiliza) el trabajo. Sin capacidad responde al instante:
+    429 si el usuario agotó su cupo, 503 si la cola global está llena.
+    """
+    try:
+        trabajo, _ = trabajos.encolar(tipo, clave, usuario=request.user)
+    except ColaLlena as e:
+        logger.warning('Exportación rechazada (%s) para %s: %s', tipo, request.user.pk, e)
+        estado = 429 if e.por_usuario else 503
+        if 'application/json' in request.headers.get('Accept', ''):
+            response = JsonResponse({'error': str(e)}, status=estado)
+        else:
+            response = HttpResponse(f'{e} Intente nuevamente en unos segundos.', status=estado,
+                                    content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = str(getattr(settings, 'REPORTES_REINTENTAR_EN', 30))
+        return response
+    return _responder_trabajo(request, trabajo)
+
+
+@login_required
+def odt_detalle_pdf(request, pk):
+    """
+    PDF de detalle desde la caché por contenido (con ETag/Last-Modified y
+    304 en peticiones condicionales); si no está, se encola su generación.
+    """
+    huella = huella_detalle(pk)
+    if huella is None:
+        raise Http404
+    etag = quote_etag(huella.clave)
+    modificado = int(huella.modificado.timestamp())  # Last-Modified tiene precisión de segundos
+    cabeceras = {'ETag': etag, 'Last-Modified': http_date(modificado)}
+
+    response = get_conditional_response(request, etag=etag, last_modified=modificado)
+    if response is None:
+        ruta = cache_detalle().obtener(huella.clave)
+        archivo = None
+        if ruta is not None:
+            try:
+                archivo = open(ruta, 'rb')
+            except FileNotFoundError:
+                pass  # desalojado entre obtener() y open(): igual que si no estuviera
+        if archivo is None:
+            return _encolar(request, TrabajoReporte.Tipo.DETALLE_PDF, trabajos.clave_detalle(pk, huella))
+        response = FileResponse(archivo, content_type='application/pdf', filename='detalle_odt.pdf')
+    for cabecera, valor in cabeceras.items():
+        response[cabecera] = valor
+    return response
+
+
+def _trabajo_visible(request, pk):
+    trabajo = get_object_or_404(TrabajoReporte, pk=pk)
+    if not trabajos.puede_descargar(request.user, trabajo):
+        raise PermissionDenied
+    return trabajo
+
+
+@login_required
+def trabajo_reporte_estado(request, pk):
+    trabajo = _trabajo_visible(request, pk)
+    if trabajo.listo or 'application/json' in request.headers.get('Accept', ''):
+        return _responder_trabajo(request, trabajo)
+    return render(request, 'reportes/trabajo_estado.html', {
+        'title': 'Generando exportación',
+        'trabajo': trabajo,
+    })
+
+
+@login_required
+def trabajo_reporte_descarga(request, pk):
+    trabajo = _trabajo_visible(request, pk)
+    if not trabajo.listo or not trabajo.archivo:
+        return redirect('trabajo_reporte_estado', pk=pk)
+    _, nombre, content_type, _ = trabajos.GENERADORES[trabajo.tipo]
+    try:
+        archivo = trabajo.archivo.open('rb')
+    except FileNotFoundError:
+        raise Http404('El archivo expiró, vuelva a generarlo.')
+    return FileResponse(archivo, content_type=content_type, filename=nombre,
+                        as_attachment=not nombre.endswith('.pdf'))
+
+
+@login_required
+@permission_required('controlodt.estadisticas', raise_exception=True)
+def trabajo_reporte_metricas(request):
+    """Cola de exportaciones: ocupación y percentiles de espera/render (JSON)."""
+    return JsonResponse(trabajos.metricas())
+
+
+def _filtros(request):
+    """
+    Filtros del reporte validados, para todas las vistas de reportes y
+    exportaciones: (filtros, None) o (None, 400) si alguno no es válido,
+    antes de consultar o de encolar un trabajo que fallaría en el worker.
+    """
+    filtros = FiltrosReporte(request.GET)
+    try:
+        filtros.since
+    except ValueError as e:
+        return None, HttpResponseBadRequest(str(e))
+    return filtros, None
+
+
+@login_required
+@permission_required('controlodt.estadisticas', raise_exception=True)
+def reporte_odt_view(request):
+    # --- 1. Filtros desde GET ---
+    filtros, error = _filtros(request)
+    if error:
+        return error
+    queryset = filtros.queryset().order_by('-creado_en')
+
+    # --- 2. Totales y estadísticas (una consulta agrupada) ---
+    estadisticas = estadisticas_reporte(filtros)
+
+    # --- 3. Paginación ---
+    page = request.GET.get('page', 1)
+    paginator = paginador('reporte_odt', queryset, 30, request.GET)  # 30 registros por página
+    
+    try:
+        odts = paginator.page(page)
+    except PageNotAnInteger:
+        odts = paginator.page(1)
+    except EmptyPage:
+        odts = paginator.page(paginator.num_pages)
+
+    context = {
+        'odts': odts,  # Objeto paginado
+        **estadisticas,
+        'filtros': {
+            'maquinarias': listas.opciones('maquinarias'),
+            'tipos': listas.opciones('tipos'),
+            'estados': RegistroODT.EstadoODT.choices,
+            'prioridades': RegistroODT.prioridad_choices,
+        }
+    }
+
+    return render(request, 'reportes/reporte_odt.html', context)
+
+@login_required
+@permission_required('controlodt.estadisticas', raise_exception=True)
+def reporte_odt_pdf(request):
+    filtros, error = _filtros(request)
+    if error:
+        return error
+    return _encolar(request, TrabajoReporte.Tipo.REPORTE_PDF, filtros.clave())
+
+
+@login_required
+@permission_required('controlodt.estadisticas', raise_exception=True)
+def reporte_odt_excel(request):
+    filtros, error = _filtros(request)
+    if error:
+        return error
+    return _encolar(request, TrabajoReporte.Tipo.REPORTE_EXCEL, filtros.clave())
+
+
+@login_required
+@permission_required('controlodt.estadisticas', raise_exception=True)
+def odt_detalles_lote(request):
+    """
+    PDFs de detalle de todas las ODT filtradas (filtros del reporte y/o
+    ?ids=) en un solo PDF (?formato=pdf) o en un ZIP (?formato=zip).
+    """
+    tipos = {'pdf': TrabajoReporte.Tipo.LOTE_PDF, 'zip': TrabajoReporte.Tipo.LOTE_ZIP}
+    formato = request.GET.get('formato', 'pdf')
+    if formato not in tipos:
+        return HttpResponseBadRequest(f'Formato desconocido: {formato}')
+    filtros, error = _filtros(request)
+    if error:
+        return error
+    clave = filtros.clave()
+    if len(clave) > TrabajoReporte._meta.get_field('clave').max_length:
+        return HttpResponseBadRequest('Demasiadas ODT seleccionadas; use los filtros del reporte.')
+    return _encolar(request, tipos[formato], clave)
+
+
+@login_required
+@permission_required('controlodt.estadisticas', raise_exception=True)
+def exportar_odt_csv(request):
+    """
+    CSV en streaming de una tabla (?tabla=odt|detalle|repuestos|personal),
+    con los filtros del reporte y ?since= para cargas incrementales.
+    """
+    tabla = request.GET.get('tabla', 'odt')
+    if tabla not in TABLAS_CSV:
+        return HttpResponseBadRequest(f'Tabla desconocida: {tabla}')
+    filtros, error = _filtros(request)
+    if error:
+        return error
+    queryset = filtros.queryset()
+    return respuesta_streaming(filas_csv(queryset, tabla), 'text/csv; charset=utf-8', f'{tabla}.csv')
+
+
+@login_required
+@permission_required('controlodt.estadisticas', raise_exception=True)
+def exportar_odt_ndjson(request):
+    """
+    NDJSON en streaming: una ODT por línea con su detalle, repuestos y personal.
+    """
+    filtros, error = _filtros(request)
+    if error:
+        return error
+    queryset = filtros.queryset()
+    return respuesta_streaming(filas_ndjson(queryset), 'application/x-ndjson', 'odt.ndjson')
@@ -0,0 +1,173 @@
+from django.contrib import messages
+from django.contrib.auth import update_session_auth_hash
+from django.contrib.auth.decorators import login_required, permission_required
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.decorators.http import require_POST
+
+from ..busqueda import buscar_usuarios
+from ..forms import CambiarPasswordForm, MiPerfilForm, UserCreateForm, UserUpdateForm
+from ..models import User
+from ..paginacion import paginador
+
+
+@login_required
+@permission_required('controlodt.view_user', raise_exception=True)
+def listar_user(request):
+    q = (request.GET.get("q") or "").strip()
+    estado = request.GET.get("estado") or "todos"   
+    per_page_options = [8, 20, 30, 50, 100]
+
+    try:
+        per_page = int(request.GET.get("per_page") or 10)
+    except ValueError:
+        per_page = 10
+    if per_page not in per_page_options:
+        per_page = 10
+
+    users = User.objects.all().order_by("-date_joined")
+
+    if q:
+        users = buscar_usuarios(users, q)
+
+    if estado == "activos":
+        users = users.filter(is_active=True)
+    elif estado == "inactivos":
+        users = users.filter(is_active=False)
+
+    paginator = paginador('listar_user', users, per_page, request.GET)
+    page_obj = paginator.get_page(request.GET.get("page"))
+
+    context = {
+        "page_obj": page_obj,
+        "q": q,
+        "estado": estado,
+        "per_page": per_page,
+        "per_page_options": per_page_options,
+        "total": paginator.count,
+        "current_querystring": request.META.get("QUERY_STRING", ""),
+    }
+    return render(request, "users/listar_user.html", context)
+
+
+@login_required
+
+@require_POST
+def toggle_active_user(request, pk):
+    user = get_object_or_404(User, pk=pk)
+
+    if user == request.user:
+        messages.error(request, "No puedes cambiar tu propio estado.")
+        return redirect(reverse("listar_user"))
+
+    user.is_active = not user.is_active
+    user.save(update_fields=["is_active", "updated_at"])
+
+    messages.success(
+        request,
+        f"Usuario {'activado' if user.is_active else 'dado de baja'} correctamente."
+    )
+
+    base = reverse("listar_user")
+    next_url = request.POST.get("next", "")
+
+    if next_url.startswith("?"):
+        return redirect(f"{base}{next_url}")
+
+    if next_url and url_has_allowed_host_and_scheme(
+        url=next_url,
+        allowed_hosts={request.get_host()},
+        require_https=request.is_secure()
+    ):
+        return redirect(next_url)
+
+   
+    return redirect(base)
+
+
+@login_required
+def mi_perfil(request):
+    user = request.user
+
+    if request.method == 'POST':
+        if 'guardar_perfil' in request.POST:
+            perfil_form = MiPerfilForm(request.POST, request.FILES, instance=user)
+            password_form = CambiarPasswordForm(user)  
+            if perfil_form.is_valid():
+                perfil_form.save()
+                messages.success(request, 'Perfil actualizado correctamente.')
+                return redirect('dashboard')
+
+        elif 'cambiar_password' in request.POST:
+            perfil_form = MiPerfilForm(instance=user)  
+            password_form = CambiarPasswordForm(user, request.POST)
+            if password_form.is_valid():
+                user = password_form.save()
+                update_session_auth_hash(request, user)
+                messages.success(request, 'Contraseña actualizada correctamente.')
+                return redirect('dashboard')
+
+    else:
+        perfil_form = MiPerfilForm(instance=user)
+        password_form = CambiarPasswordForm(user)
+
+    return render(request, 'users/mi_perfil.html', {
+        'perfil_form': perfil_form,
+        'password_form': password_form,
+    })
+
+@login_required
+@permission_required('controlodt.add_user', raise_exception=True)
+def user_create(request):
+    next_url = request.GET.get("next") or reverse("listar_user")
+    if request.method == "POST":
+        form = UserCreateForm(request.POST, request.FILES)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Usuario creado correctamente.")
+            return redirect(next_url)
+    else:
+        form = UserCreateForm()
+    return render(request, "users/user_form.html", {
+        "form": form,
+        "title": "Crear usuario",
+        "is_edit": False,
+        "next_url": next_url,
+    })
+
+
+@login_required
+@permission_required('controlodt.change_user', raise_exception=True)
+def user_edit(request, pk):
+    user_obj = get_object_or_404(User, pk=pk)
+    next_url = request.GET.get("next") or reverse("listar_user")
+
+    original_is_active = user_obj.is_active
+
+    if request.method == "POST":
+        form = UserUpdateForm(request.POST, request.FILES, instance=user_obj)
+        if form.is_valid():
+            if user_obj.pk == request.user.pk:
+                cleaned_is_active = form.cleaned_data.get("is_active")
+                if cleaned_is_active is False and original_is_active is True:
+                    messages.error(request, "No puedes darte de baja a ti mismo.")
+                    saved = form.save(commit=False)
+                    saved.is_active = True
+                    saved.save()
+                    messages.info(request, "Se guardaron otros cambios; el estado se mantuvo activo.")
+                    return redirect(next_url)
+            form.save()
+            messages.success(request, "Usuario actualizado correctamente.")
+            return redirect(next_url)
+    else:
+        form = UserUpdateForm(instance=user_obj)
+
+    return render(request, "users/user_form.html", {
+        "form": form,
+        "title": "Editar usuario",
+        "is_edit": True,
+        "user_obj": user_obj,
+        "next_url": next_url,
+    })
+    
@@ -0,0 +1,24 @@
+"""
+Runner de `manage.py test` (settings.TEST_RUNNER).
+
+Las pruebas usan una caché en memoria en lugar de CACHES: la caché por
+defecto vive en disco (BASE_DIR/cache/django) y las pruebas la escribirían
+(incluso al migrar la base de pruebas) y la vaciarían con cache.clear().
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+CACHES_PRUEBAS = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'pruebas'},
+}
+
+
+class EjecutorPruebas(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches = override_settings(CACHES=CACHES_PRUEBAS)
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        super().teardown_test_environment(**kwargs)
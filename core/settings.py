@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import importlib.util
 from pathlib import Path
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 import os
@@ -46,6 +48,32 @@ INSTALLED_APPS = [
 ]
 
 AUTH_USER_MODEL = "controlodt.User"
+# Caché de Django: "locmem" (por proceso, desarrollo), "file" (compartida entre
+# los workers de una misma máquina) o "redis" (REDIS_URL, varias máquinas).
+# La usan los permisos, las listas de opciones y los conteos de paginación
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file")
+_CACHES = {
+    "locmem": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "controlodt"},
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / "cache" / "django")),
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+    "redis": {"BACKEND": "django.core.cache.backends.redis.RedisCache",
+              "LOCATION": os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")},
+}
+CACHES = {"default": {**_CACHES[CACHE_BACKEND], "KEY_PREFIX": "odt"}}
+# manage.py test usa una caché en memoria (ver core/pruebas.py)
+TEST_RUNNER = "core.pruebas.EjecutorPruebas"
+# Listas (id, etiqueta) de líneas, equipos y usuarios para combos (ver controlodt/listas.py)
+LISTAS_CACHE = "default"
+LISTAS_CACHE_TTL = int(os.getenv("LISTAS_CACHE_TTL", 3600))
+
+# Permisos por usuario cacheados entre requests y workers (ver controlodt/permisos.py);
+# PERMISOS_CACHE es el alias de CACHES, que debe ser compartido entre workers
+AUTHENTICATION_BACKENDS = ["controlodt.permisos.BackendPermisosCache"]
+PERMISOS_CACHE = "default"
+PERMISOS_CACHE_TTL = int(os.getenv("PERMISOS_CACHE_TTL", 3600))
 LOGIN_URL = "home"      
 LOGIN_REDIRECT_URL = "dashboard"
 LOGOUT_REDIRECT_URL = "home"
@@ -96,17 +124,65 @@ WSGI_APPLICATION = 'core.wsgi.application'
 #DATABASES = {  
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Conexiones a la base de DATABASE_URL:
+# - DB_CONN_MAX_AGE: segundos que un worker reutiliza su conexión (0 = abrir y
+#   cerrar en cada request), con health check al retomarla.
+# - DB_POOL=1: pool de psycopg 3 por proceso, en lugar de conexiones
+#   persistentes. Requiere instalar psycopg[binary,pool] (requirements.txt trae
+#   psycopg2). Cada proceso atiende a lo sumo GUNICORN_THREADS requests a la
+#   vez, así que el pool no necesita más conexiones que hilos; el total en el
+#   servidor es WEB_CONCURRENCY x DB_POOL_MAX_SIZE (ver gunicorn.conf.py).
+# `manage.py medir_conexiones` compara los modos.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", 1))
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 60))
+DB_POOL = os.getenv("DB_POOL", "").lower() in ("1", "true", "si", "sí")
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", GUNICORN_THREADS))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+
 if DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL)
+        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=True)
     }
+    if DB_POOL and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+        if not (importlib.util.find_spec('psycopg') and importlib.util.find_spec('psycopg_pool')):
+            raise ImproperlyConfigured('DB_POOL=1 requiere psycopg 3 con el pool: pip install "psycopg[binary,pool]"')
+        # El pool no admite conexiones persistentes: devuelve la conexión al terminar la request
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': min(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE),
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+        }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': BASE_DIR / 'db.sqlite3',
+            'NAME': Path(os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3')),
+            # Base de pruebas en archivo (no en memoria compartida) para que los
+            # tests concurrentes bloqueen y esperen como en producción
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
+    # Perfil "produccion" (por defecto) para varios workers en un solo servidor:
+    # WAL (lectores no bloquean al escritor), transacciones IMMEDIATE (esperan
+    # el lock al empezar en lugar de fallar al escribir) y busy_timeout; "basico"
+    # deja los valores de SQLite. Ver manage.py optimizar_sqlite y medir_escritura_sqlite
+    SQLITE_PERFIL = os.getenv('SQLITE_PERFIL', 'produccion')
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 20000)),
+        'synchronous': 'NORMAL',  # seguro con WAL: solo se arriesga la última transacción ante un corte de luz
+        'mmap_size': int(os.getenv('SQLITE_MMAP_BYTES', 256 * 1024 * 1024)),
+        'cache_size': -int(os.getenv('SQLITE_CACHE_KIB', 32 * 1024)),  # negativo = KiB
+        'temp_store': 'MEMORY',
+    }
+    if SQLITE_PERFIL == 'produccion':
+        DATABASES['default']['OPTIONS'] = {
+            'init_command': ';'.join(f'PRAGMA {pragma}={valor}' for pragma, valor in SQLITE_PRAGMAS.items()),
+            'transaction_mode': 'IMMEDIATE',
+        }
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -149,6 +225,49 @@ STATICFILES_DIRS = [
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Cola de exportaciones (manage.py procesar_trabajos_reporte). Los archivos
+# generados van a REPORTES_DIR, fuera de MEDIA_ROOT: solo se descargan por la
+# vista del trabajo, que revisa permisos
+REPORTES_DIR = Path(os.getenv('REPORTES_DIR', BASE_DIR / 'exportaciones'))
+# Segundos que un archivo generado queda disponible / máximo para generarlo
+REPORTES_TTL = int(os.getenv('REPORTES_TTL', 3600))
+REPORTES_TIEMPO_MAXIMO = int(os.getenv('REPORTES_TIEMPO_MAXIMO', 900))
+# Admisión: trabajos activos en total / por usuario antes de responder 503 / 429,
+# y segundos sugeridos en Retry-After
+REPORTES_COLA_MAXIMA = int(os.getenv('REPORTES_COLA_MAXIMA', 50))
+REPORTES_COLA_POR_USUARIO = int(os.getenv('REPORTES_COLA_POR_USUARIO', 3))
+REPORTES_REINTENTAR_EN = int(os.getenv('REPORTES_REINTENTAR_EN', 30))
+
+# Gráficos del reporte PDF: 'png' o 'svg' (vectorial)
+REPORTES_GRAFICOS_FORMATO = os.getenv('REPORTES_GRAFICOS_FORMATO', 'png')
+
+# Reporte PDF por partes: desde cuántas filas, filas por parte y procesos
+# (0 = uno por CPU). Ver controlodt/pdf.py y manage.py medir_reporte_pdf
+PDF_REPORTE_UMBRAL = int(os.getenv('PDF_REPORTE_UMBRAL', 2000))
+PDF_REPORTE_FILAS_PARTE = int(os.getenv('PDF_REPORTE_FILAS_PARTE', 500))
+PDF_REPORTE_PROCESOS = int(os.getenv('PDF_REPORTE_PROCESOS', 0))
+
+# Conteo de los listados paginados por vista: 'exacto', 'cache' (TTL corto),
+# 'estimado' (PostgreSQL sin filtros) o 'sin_conteo'. Ver controlodt/paginacion.py
+PAGINACION_CONTEO = {
+    'odt_list': 'cache',
+    'reporte_odt': 'estimado',
+    'listar_user': 'exacto',
+    'group_list': 'exacto',
+}
+PAGINACION_CONTEO_TTL = int(os.getenv('PAGINACION_CONTEO_TTL', 60))
+
+# Rutas MEDIA recordadas por el resolutor de imágenes de los PDFs
+PDF_MEDIA_CACHE = int(os.getenv('PDF_MEDIA_CACHE', 1024))
+
+# Logos de los PDFs que se sirven reducidos (ver controlodt/imagenes.py)
+PDF_LOGOS = ['src/img/logo.png', 'src/img/logoc.jpg']
+IMAGENES_DERIVADOS_DIR = Path(os.getenv('IMAGENES_DERIVADOS_DIR', BASE_DIR / 'cache' / 'derivados'))
+
+# Caché en disco de PDFs de detalle (LRU por tamaño)
+PDF_CACHE_DIR = Path(os.getenv('PDF_CACHE_DIR', BASE_DIR / 'cache' / 'pdf'))
+PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+
 
 #ALLOWED_HOSTS = ['127.0.0.1','localhost','sitewebodt-production.up.railway.app']
 ALLOWED_HOSTS = ['*']
@@ -81,10 +81,19 @@ urlpatterns = [
     
     path('odt/<int:pk>/editar-general/', views.odt_editar_general, name='odt_editar_general'),
 
+    # Acciones masivas desde el listado
+    path('odt/acciones-masivas/', views.odt_accion_masiva, name='odt_accion_masiva'),
+
 
     path('reportes/odt/', views.reporte_odt_view, name='reporte_odt'),
     path('reportes/odt/pdf/', views.reporte_odt_pdf, name='reporte_odt_pdf'),
+    path('reportes/odt/detalles/', views.odt_detalles_lote, name='odt_detalles_lote'),
     path('reporte-odt-excel/', views.reporte_odt_excel, name='reporte_odt_excel'),
+    path('reportes/trabajos/metricas/', views.trabajo_reporte_metricas, name='trabajo_reporte_metricas'),
+    path('reportes/trabajos/<int:pk>/', views.trabajo_reporte_estado, name='trabajo_reporte_estado'),
+    path('reportes/trabajos/<int:pk>/descarga/', views.trabajo_reporte_descarga, name='trabajo_reporte_descarga'),
+    path('reportes/odt/exportar.csv', views.exportar_odt_csv, name='exportar_odt_csv'),
+    path('reportes/odt/exportar.ndjson', views.exportar_odt_ndjson, name='exportar_odt_ndjson'),
 
     
 ]
@@ -0,0 +1,10 @@
+# Configuración de gunicorn (la lee sola desde el directorio de trabajo).
+# Por defecto deja el modelo de gunicorn: un worker sync (un proceso, un hilo).
+# Para más concurrencia definir WEB_CONCURRENCY (procesos) y GUNICORN_THREADS
+# (hilos por proceso; con más de uno gunicorn usa workers gthread). Son las
+# mismas variables con las que core/settings.py dimensiona el pool de
+# conexiones (DB_POOL_MAX_SIZE = hilos por proceso).
+import os
+
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+threads = int(os.getenv("GUNICORN_THREADS", 1))